@@ -0,0 +1,57 @@
+"""store cost columns as DOUBLE PRECISION
+
+Revision ID: 0b8e3f6a1c52
+Revises: f29c6a4e8d10
+Create Date: 2026-10-16 10:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0b8e3f6a1c52"
+down_revision: Union[str, Sequence[str], None] = "f29c6a4e8d10"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _set_cost_type(column_type: str) -> None:
+    # Column types can't change on a compressed hypertable, so decompress and
+    # turn compression off around the ALTER, then restore the settings
+    op.execute("SELECT remove_compression_policy('spans', if_exists => TRUE);")
+    op.execute(
+        """
+        SELECT decompress_chunk(c, if_compressed => TRUE)
+        FROM show_chunks('spans') c;
+        """
+    )
+    op.execute("ALTER TABLE spans SET (timescaledb.compress = false);")
+
+    op.execute(f"ALTER TABLE spans ALTER COLUMN cost_usd TYPE {column_type};")
+    op.execute(f"ALTER TABLE traces ALTER COLUMN total_cost_usd TYPE {column_type};")
+    op.execute(f"ALTER TABLE agents ALTER COLUMN total_cost_usd TYPE {column_type};")
+    op.execute(f"ALTER TABLE replays ALTER COLUMN cost_usd TYPE {column_type};")
+
+    op.execute(
+        """
+        ALTER TABLE spans SET (
+            timescaledb.compress,
+            timescaledb.compress_segmentby = 'trace_id',
+            timescaledb.compress_orderby = 'start_time DESC, span_id'
+        );
+        """
+    )
+    op.execute("SELECT add_compression_policy('spans', INTERVAL '7 days', if_not_exists => TRUE);")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # asyncpg decodes NUMERIC into decimal.Decimal; float8 comes back as a plain float
+    _set_cost_type("DOUBLE PRECISION")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    _set_cost_type("DECIMAL(10, 6)")
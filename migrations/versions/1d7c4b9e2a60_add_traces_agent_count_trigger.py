@@ -0,0 +1,81 @@
+"""maintain traces.agent_count with a trigger
+
+Revision ID: 1d7c4b9e2a60
+Revises: 0b8e3f6a1c52
+Create Date: 2026-10-16 10:10:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "1d7c4b9e2a60"
+down_revision: Union[str, Sequence[str], None] = "0b8e3f6a1c52"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # traces.agent_count has never been written; agents are registered once per
+    # (trace_id, name), so count them as they are inserted and deleted, the same
+    # way span_count is kept. The ingestion upsert only fires this on real inserts.
+    op.execute(
+        """
+        UPDATE traces t
+        SET agent_count = a.agent_count
+        FROM (
+            SELECT trace_id, COUNT(*) AS agent_count
+            FROM agents
+            GROUP BY trace_id
+        ) a
+        WHERE a.trace_id = t.trace_id;
+        """
+    )
+    op.execute("UPDATE traces SET agent_count = 0 WHERE agent_count IS NULL;")
+
+    op.execute(
+        """
+        CREATE FUNCTION traces_agent_count_inc() RETURNS TRIGGER AS $$
+        BEGIN
+            UPDATE traces SET agent_count = COALESCE(agent_count, 0) + 1
+            WHERE trace_id = NEW.trace_id;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+        """
+    )
+    op.execute(
+        """
+        CREATE FUNCTION traces_agent_count_dec() RETURNS TRIGGER AS $$
+        BEGIN
+            UPDATE traces SET agent_count = agent_count - 1 WHERE trace_id = OLD.trace_id;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER agents_agent_count_inc
+        AFTER INSERT ON agents
+        FOR EACH ROW EXECUTE FUNCTION traces_agent_count_inc();
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER agents_agent_count_dec
+        AFTER DELETE ON agents
+        FOR EACH ROW EXECUTE FUNCTION traces_agent_count_dec();
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS agents_agent_count_dec ON agents;")
+    op.execute("DROP TRIGGER IF EXISTS agents_agent_count_inc ON agents;")
+    op.execute("DROP FUNCTION IF EXISTS traces_agent_count_dec();")
+    op.execute("DROP FUNCTION IF EXISTS traces_agent_count_inc();")
@@ -0,0 +1,32 @@
+"""add partial index for failed traces
+
+Revision ID: 2e5a9d3c7b14
+Revises: 1d7c4b9e2a60
+Create Date: 2026-10-16 10:20:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "2e5a9d3c7b14"
+down_revision: Union[str, Sequence[str], None] = "1d7c4b9e2a60"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # classify_failed_traces scans newest failed traces; the planner only uses a
+    # partial index when the query repeats the predicate literally
+    op.execute(
+        "CREATE INDEX idx_traces_failed_by_start_time ON traces (start_time DESC) "
+        "WHERE status = 'failed';"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP INDEX IF EXISTS idx_traces_failed_by_start_time;")
@@ -0,0 +1,32 @@
+"""replace spans trace_id index with (trace_id, start_time, span_id)
+
+Revision ID: 3a6f1e8b4d27
+Revises: 2e5a9d3c7b14
+Create Date: 2026-10-16 10:30:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "3a6f1e8b4d27"
+down_revision: Union[str, Sequence[str], None] = "2e5a9d3c7b14"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Span pages read WHERE trace_id = $1 ORDER BY start_time, span_id, so the
+    # composite returns rows in page order and LIMIT stops without a sort.
+    # Its leading column also serves plain trace_id lookups.
+    op.execute("CREATE INDEX idx_spans_trace_start ON spans (trace_id, start_time, span_id);")
+    op.execute("DROP INDEX IF EXISTS idx_spans_trace_id;")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("CREATE INDEX idx_spans_trace_id ON spans(trace_id);")
+    op.execute("DROP INDEX IF EXISTS idx_spans_trace_start;")
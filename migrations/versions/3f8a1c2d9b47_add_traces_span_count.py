@@ -0,0 +1,82 @@
+"""add trigger-maintained span_count to traces
+
+Revision ID: 3f8a1c2d9b47
+Revises: a1b2c3d4e5f6
+Create Date: 2026-10-16 09:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "3f8a1c2d9b47"
+down_revision: Union[str, Sequence[str], None] = "a1b2c3d4e5f6"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Denormalized span counter so list endpoints don't count spans per row
+    op.execute("ALTER TABLE traces ADD COLUMN span_count INTEGER NOT NULL DEFAULT 0;")
+
+    # Backfill existing traces
+    op.execute(
+        """
+        UPDATE traces t
+        SET span_count = s.span_count
+        FROM (
+            SELECT trace_id, COUNT(*) AS span_count
+            FROM spans
+            GROUP BY trace_id
+        ) s
+        WHERE s.trace_id = t.trace_id;
+        """
+    )
+
+    # Keep the counter in sync as spans are inserted and deleted
+    op.execute(
+        """
+        CREATE FUNCTION traces_span_count_inc() RETURNS TRIGGER AS $$
+        BEGIN
+            UPDATE traces SET span_count = span_count + 1 WHERE trace_id = NEW.trace_id;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+        """
+    )
+    op.execute(
+        """
+        CREATE FUNCTION traces_span_count_dec() RETURNS TRIGGER AS $$
+        BEGIN
+            UPDATE traces SET span_count = span_count - 1 WHERE trace_id = OLD.trace_id;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER spans_span_count_inc
+        AFTER INSERT ON spans
+        FOR EACH ROW EXECUTE FUNCTION traces_span_count_inc();
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER spans_span_count_dec
+        AFTER DELETE ON spans
+        FOR EACH ROW EXECUTE FUNCTION traces_span_count_dec();
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS spans_span_count_dec ON spans;")
+    op.execute("DROP TRIGGER IF EXISTS spans_span_count_inc ON spans;")
+    op.execute("DROP FUNCTION IF EXISTS traces_span_count_dec();")
+    op.execute("DROP FUNCTION IF EXISTS traces_span_count_inc();")
+    op.execute("ALTER TABLE traces DROP COLUMN IF EXISTS span_count;")
@@ -0,0 +1,34 @@
+"""compress span payload columns with lz4
+
+Revision ID: 4c8d2a7f5e39
+Revises: 3a6f1e8b4d27
+Create Date: 2026-10-16 10:40:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "4c8d2a7f5e39"
+down_revision: Union[str, Sequence[str], None] = "3a6f1e8b4d27"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_PAYLOAD_COLUMNS = ("input", "output", "error")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Span payloads are large and read whole, so TOAST compresses nearly every
+    # value; lz4 compresses and decompresses several times faster than the
+    # default pglz. Only newly written values are affected (PostgreSQL 14+).
+    for column in _PAYLOAD_COLUMNS:
+        op.execute(f"ALTER TABLE spans ALTER COLUMN {column} SET COMPRESSION lz4;")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for column in _PAYLOAD_COLUMNS:
+        op.execute(f"ALTER TABLE spans ALTER COLUMN {column} SET COMPRESSION pglz;")
@@ -0,0 +1,30 @@
+"""add covering index for agent lookups by id
+
+Revision ID: 5b1e7c3d9a46
+Revises: 4c8d2a7f5e39
+Create Date: 2026-10-16 10:50:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "5b1e7c3d9a46"
+down_revision: Union[str, Sequence[str], None] = "4c8d2a7f5e39"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # get_span joins agents only for name/role; carrying them in the index lets
+    # the join be an index-only scan once the visibility map is current
+    op.execute("CREATE INDEX idx_agents_cover ON agents (agent_id) INCLUDE (name, role);")
+    op.execute("ANALYZE agents;")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP INDEX IF EXISTS idx_agents_cover;")
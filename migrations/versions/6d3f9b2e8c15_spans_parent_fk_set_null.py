@@ -0,0 +1,45 @@
+"""stop cascading deletes through spans.parent_span_id
+
+Revision ID: 6d3f9b2e8c15
+Revises: 5b1e7c3d9a46
+Create Date: 2026-10-16 11:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "6d3f9b2e8c15"
+down_revision: Union[str, Sequence[str], None] = "5b1e7c3d9a46"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Spans are only ever deleted through their trace (traces -> spans cascade),
+    # which removes the whole tree at once. Cascading through the parent link as
+    # well fires one recursive trigger per descendant, so just detach children;
+    # idx_spans_parent_span_id backs the SET NULL lookup.
+    op.execute("ALTER TABLE spans DROP CONSTRAINT spans_parent_span_id_fkey;")
+    op.execute(
+        """
+        ALTER TABLE spans
+        ADD CONSTRAINT spans_parent_span_id_fkey
+        FOREIGN KEY (parent_span_id) REFERENCES spans(span_id) ON DELETE SET NULL;
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("ALTER TABLE spans DROP CONSTRAINT spans_parent_span_id_fkey;")
+    op.execute(
+        """
+        ALTER TABLE spans
+        ADD CONSTRAINT spans_parent_span_id_fkey
+        FOREIGN KEY (parent_span_id) REFERENCES spans(span_id) ON DELETE CASCADE;
+        """
+    )
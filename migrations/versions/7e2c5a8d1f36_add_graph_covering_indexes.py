@@ -0,0 +1,44 @@
+"""add covering indexes for agent graph construction
+
+Revision ID: 7e2c5a8d1f36
+Revises: 6d3f9b2e8c15
+Create Date: 2026-10-16 11:10:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "7e2c5a8d1f36"
+down_revision: Union[str, Sequence[str], None] = "6d3f9b2e8c15"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # The edge query windows over (from_agent_id, to_agent_id) ordered by
+    # timestamp for one trace; this returns rows already in that order.
+    # agent_messages is a plain table, so build it without blocking ingestion.
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_agent_messages_trace_pair "
+            "ON agent_messages (trace_id, from_agent_id, to_agent_id, timestamp) "
+            "WHERE from_agent_id IS NOT NULL AND to_agent_id IS NOT NULL;"
+        )
+
+    # Per-agent span aggregates read only these columns. Hypertables don't
+    # support CONCURRENTLY, so this one is a regular build.
+    op.execute(
+        "CREATE INDEX idx_spans_trace_agent ON spans (trace_id, agent_id) "
+        "INCLUDE (input_tokens, output_tokens, cost_usd, status, start_time, end_time);"
+    )
+    op.execute("ANALYZE agent_messages;")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP INDEX IF EXISTS idx_spans_trace_agent;")
+    op.execute("DROP INDEX IF EXISTS idx_agent_messages_trace_pair;")
@@ -0,0 +1,145 @@
+"""maintain per-agent span metrics with a trigger
+
+Revision ID: 8f4b1d6e3a92
+Revises: 7e2c5a8d1f36
+Create Date: 2026-10-16 11:20:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "8f4b1d6e3a92"
+down_revision: Union[str, Sequence[str], None] = "7e2c5a8d1f36"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # agents already has total_spans/total_tokens/total_cost_usd/error_count but
+    # nothing writes them. Keep them current from spans, like traces.span_count,
+    # so the agent graph reads one row per agent instead of aggregating spans.
+    # Latency is kept as a sum and a count of finished spans so the average
+    # matches AVG(end_time - start_time), which skips open spans.
+    op.execute(
+        """
+        ALTER TABLE agents
+            ADD COLUMN total_latency_ms DOUBLE PRECISION NOT NULL DEFAULT 0,
+            ADD COLUMN latency_span_count INTEGER NOT NULL DEFAULT 0;
+        """
+    )
+
+    # Backfill existing agents
+    op.execute(
+        """
+        UPDATE agents a
+        SET total_spans = s.total_spans,
+            total_tokens = s.total_tokens,
+            total_cost_usd = s.total_cost_usd,
+            error_count = s.error_count,
+            total_latency_ms = s.total_latency_ms,
+            latency_span_count = s.latency_span_count
+        FROM (
+            SELECT
+                agent_id,
+                COUNT(*) AS total_spans,
+                COALESCE(SUM(input_tokens + output_tokens), 0) AS total_tokens,
+                COALESCE(SUM(cost_usd), 0) AS total_cost_usd,
+                COUNT(*) FILTER (WHERE status = 'error') AS error_count,
+                COALESCE(SUM(EXTRACT(EPOCH FROM (end_time - start_time)) * 1000), 0)
+                    AS total_latency_ms,
+                COUNT(end_time) AS latency_span_count
+            FROM spans
+            WHERE agent_id IS NOT NULL
+            GROUP BY agent_id
+        ) s
+        WHERE s.agent_id = a.agent_id;
+        """
+    )
+    op.execute(
+        """
+        UPDATE agents
+        SET total_spans = COALESCE(total_spans, 0),
+            total_tokens = COALESCE(total_tokens, 0),
+            total_cost_usd = COALESCE(total_cost_usd, 0),
+            error_count = COALESCE(error_count, 0);
+        """
+    )
+
+    # Keep the metrics in sync as spans are inserted and deleted
+    op.execute(
+        """
+        CREATE FUNCTION agents_span_metrics_inc() RETURNS TRIGGER AS $$
+        BEGIN
+            UPDATE agents SET
+                total_spans = COALESCE(total_spans, 0) + 1,
+                total_tokens = COALESCE(total_tokens, 0)
+                    + COALESCE(NEW.input_tokens + NEW.output_tokens, 0),
+                total_cost_usd = COALESCE(total_cost_usd, 0) + COALESCE(NEW.cost_usd, 0),
+                error_count = COALESCE(error_count, 0)
+                    + CASE WHEN NEW.status = 'error' THEN 1 ELSE 0 END,
+                total_latency_ms = total_latency_ms
+                    + COALESCE(EXTRACT(EPOCH FROM (NEW.end_time - NEW.start_time)) * 1000, 0),
+                latency_span_count = latency_span_count
+                    + CASE WHEN NEW.end_time IS NOT NULL THEN 1 ELSE 0 END
+            WHERE agent_id = NEW.agent_id;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+        """
+    )
+    op.execute(
+        """
+        CREATE FUNCTION agents_span_metrics_dec() RETURNS TRIGGER AS $$
+        BEGIN
+            UPDATE agents SET
+                total_spans = total_spans - 1,
+                total_tokens = total_tokens
+                    - COALESCE(OLD.input_tokens + OLD.output_tokens, 0),
+                total_cost_usd = total_cost_usd - COALESCE(OLD.cost_usd, 0),
+                error_count = error_count
+                    - CASE WHEN OLD.status = 'error' THEN 1 ELSE 0 END,
+                total_latency_ms = total_latency_ms
+                    - COALESCE(EXTRACT(EPOCH FROM (OLD.end_time - OLD.start_time)) * 1000, 0),
+                latency_span_count = latency_span_count
+                    - CASE WHEN OLD.end_time IS NOT NULL THEN 1 ELSE 0 END
+            WHERE agent_id = OLD.agent_id;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER spans_agent_metrics_inc
+        AFTER INSERT ON spans
+        FOR EACH ROW WHEN (NEW.agent_id IS NOT NULL)
+        EXECUTE FUNCTION agents_span_metrics_inc();
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER spans_agent_metrics_dec
+        AFTER DELETE ON spans
+        FOR EACH ROW WHEN (OLD.agent_id IS NOT NULL)
+        EXECUTE FUNCTION agents_span_metrics_dec();
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS spans_agent_metrics_dec ON spans;")
+    op.execute("DROP TRIGGER IF EXISTS spans_agent_metrics_inc ON spans;")
+    op.execute("DROP FUNCTION IF EXISTS agents_span_metrics_dec();")
+    op.execute("DROP FUNCTION IF EXISTS agents_span_metrics_inc();")
+    op.execute(
+        """
+        ALTER TABLE agents
+            DROP COLUMN IF EXISTS latency_span_count,
+            DROP COLUMN IF EXISTS total_latency_ms;
+        """
+    )
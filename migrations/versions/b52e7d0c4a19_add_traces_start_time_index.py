@@ -0,0 +1,33 @@
+"""add traces start_time index for list pagination
+
+Revision ID: b52e7d0c4a19
+Revises: 3f8a1c2d9b47
+Create Date: 2026-10-16 09:10:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "b52e7d0c4a19"
+down_revision: Union[str, Sequence[str], None] = "3f8a1c2d9b47"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Backs the list endpoint's time-range filters and ORDER BY start_time DESC LIMIT,
+    # so recent pages are an index range scan instead of a full scan + sort.
+    #
+    # traces stays a regular table: a hypertable would need start_time in every
+    # unique constraint, which breaks the trace_id foreign keys from the other
+    # tables and the ingestion upsert on ON CONFLICT (trace_id).
+    op.execute("CREATE INDEX idx_traces_start_time ON traces (start_time DESC, trace_id);")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP INDEX IF EXISTS idx_traces_start_time;")
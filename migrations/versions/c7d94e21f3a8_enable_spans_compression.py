@@ -0,0 +1,45 @@
+"""enable columnstore compression on spans
+
+Revision ID: c7d94e21f3a8
+Revises: b52e7d0c4a19
+Create Date: 2026-10-16 09:20:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c7d94e21f3a8"
+down_revision: Union[str, Sequence[str], None] = "b52e7d0c4a19"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Segment compressed batches by trace so trace-scoped reads
+    # (WHERE trace_id = $1 ORDER BY start_time) touch one segment per chunk
+    op.execute(
+        """
+        ALTER TABLE spans SET (
+            timescaledb.compress,
+            timescaledb.compress_segmentby = 'trace_id',
+            timescaledb.compress_orderby = 'start_time DESC, span_id'
+        );
+        """
+    )
+    op.execute("SELECT add_compression_policy('spans', INTERVAL '7 days', if_not_exists => TRUE);")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("SELECT remove_compression_policy('spans', if_exists => TRUE);")
+    op.execute(
+        """
+        SELECT decompress_chunk(c, if_compressed => TRUE)
+        FROM show_chunks('spans') c;
+        """
+    )
+    op.execute("ALTER TABLE spans SET (timescaledb.compress = false);")
@@ -0,0 +1,35 @@
+"""add jsonb_path_ops GIN indexes on hot JSONB columns
+
+Revision ID: d1a6f08b2e53
+Revises: c7d94e21f3a8
+Create Date: 2026-10-16 09:30:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "d1a6f08b2e53"
+down_revision: Union[str, Sequence[str], None] = "c7d94e21f3a8"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # jsonb_path_ops only accelerates @> containment, so queries must filter with
+    # `column @> '{"k": "v"}'` rather than `column->>'k' = 'v'`
+    op.execute(
+        "CREATE INDEX idx_spans_attributes_gin ON spans USING GIN (attributes jsonb_path_ops);"
+    )
+    op.execute(
+        "CREATE INDEX idx_traces_metadata_gin ON traces USING GIN (metadata jsonb_path_ops);"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP INDEX IF EXISTS idx_traces_metadata_gin;")
+    op.execute("DROP INDEX IF EXISTS idx_spans_attributes_gin;")
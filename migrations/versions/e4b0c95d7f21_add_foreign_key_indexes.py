@@ -0,0 +1,44 @@
+"""add indexes backing foreign keys
+
+Revision ID: e4b0c95d7f21
+Revises: d1a6f08b2e53
+Create Date: 2026-10-16 09:40:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "e4b0c95d7f21"
+down_revision: Union[str, Sequence[str], None] = "d1a6f08b2e53"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Without these, every cascaded delete on the referenced row scans the child table.
+    # Root spans have no parent, so keep the self-FK index partial.
+    op.execute(
+        "CREATE INDEX idx_spans_parent_span_id ON spans(parent_span_id) "
+        "WHERE parent_span_id IS NOT NULL;"
+    )
+    op.execute("CREATE INDEX idx_agent_messages_from_agent ON agent_messages(from_agent_id);")
+    op.execute("CREATE INDEX idx_agent_messages_to_agent ON agent_messages(to_agent_id);")
+    op.execute("CREATE INDEX idx_failure_annotations_span ON failure_annotations(span_id);")
+    op.execute("CREATE INDEX idx_failure_annotations_agent ON failure_annotations(agent_id);")
+    op.execute("CREATE INDEX idx_checkpoints_span ON checkpoints(span_id);")
+    op.execute("CREATE INDEX idx_checkpoints_agent ON checkpoints(agent_id);")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP INDEX IF EXISTS idx_checkpoints_agent;")
+    op.execute("DROP INDEX IF EXISTS idx_checkpoints_span;")
+    op.execute("DROP INDEX IF EXISTS idx_failure_annotations_agent;")
+    op.execute("DROP INDEX IF EXISTS idx_failure_annotations_span;")
+    op.execute("DROP INDEX IF EXISTS idx_agent_messages_to_agent;")
+    op.execute("DROP INDEX IF EXISTS idx_agent_messages_from_agent;")
+    op.execute("DROP INDEX IF EXISTS idx_spans_parent_span_id;")
@@ -0,0 +1,31 @@
+"""align traces start_time index with keyset pagination order
+
+Revision ID: f29c6a4e8d10
+Revises: e4b0c95d7f21
+Create Date: 2026-10-16 09:50:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "f29c6a4e8d10"
+down_revision: Union[str, Sequence[str], None] = "e4b0c95d7f21"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # list_traces pages with ORDER BY start_time DESC, trace_id DESC and seeks with
+    # (start_time, trace_id) < ($1, $2); both columns must descend for an index scan
+    op.execute("DROP INDEX IF EXISTS idx_traces_start_time;")
+    op.execute("CREATE INDEX idx_traces_start_time ON traces (start_time DESC, trace_id DESC);")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP INDEX IF EXISTS idx_traces_start_time;")
+    op.execute("CREATE INDEX idx_traces_start_time ON traces (start_time DESC, trace_id);")
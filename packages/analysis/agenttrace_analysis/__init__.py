@@ -1,7 +1,7 @@
 """AgentTrace Analysis - Agent communication graph analysis and failure classification."""
 
+from .api import create_read_pool, init_read_connection, set_db_pool
 from .api import router as api_router
-from .api import set_db_pool
 from .graph import AgentGraph, AgentNode, CommunicationEdge
 from .jobs import classify_failed_traces, classify_trace, periodic_classification_job
 from .mast import (
@@ -11,7 +11,7 @@ from .mast import (
     FailureMode,
     RuleBasedClassifier,
 )
-from .metrics import TraceMetrics, compute_trace_metrics
+from .metrics import TraceMetrics, compute_trace_metrics, compute_trace_metrics_batch
 
 __version__ = "0.1.0"
 
@@ -29,9 +29,12 @@ __all__ = [
     # Metrics
     "TraceMetrics",
     "compute_trace_metrics",
+    "compute_trace_metrics_batch",
     # API
     "api_router",
     "set_db_pool",
+    "init_read_connection",
+    "create_read_pool",
     # Jobs
     "classify_failed_traces",
     "classify_trace",
@@ -0,0 +1,49 @@
+"""orjson-backed JSON responses for the analysis API."""
+
+from __future__ import annotations
+
+from decimal import Decimal
+from typing import Any
+
+import asyncpg
+import orjson
+from fastapi.responses import JSONResponse
+
+
+def _record(record: asyncpg.Record) -> dict[str, Any]:
+    """Map a Record to a dict, dropping `_`-prefixed bookkeeping columns."""
+    row = dict(record)
+    for key in [key for key in row if key.startswith("_")]:
+        del row[key]
+    return row
+
+
+def _default(obj: Any) -> Any:
+    """Serialize types orjson does not handle natively."""
+    if isinstance(obj, asyncpg.Record):
+        return _record(obj)
+    if isinstance(obj, Decimal):
+        return float(obj)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    """Serialize content to JSON bytes."""
+    return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+def encode_jsonb(value: Any) -> bytes:
+    """Encode a value as binary-format JSONB: a version byte, then JSON text."""
+    return b"\x01" + dumps(value)
+
+
+def decode_jsonb(data: bytes) -> Any:
+    """Decode binary-format JSONB straight into Python objects."""
+    return orjson.loads(memoryview(data)[1:])
+
+
+class ORJSONResponse(JSONResponse):
+    """JSON response rendered with orjson instead of the stdlib encoder."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -2,77 +2,353 @@
 
 from __future__ import annotations
 
+import asyncio
+import base64
+import json
+from collections.abc import AsyncIterator
 from datetime import datetime
-from typing import Any
+from typing import Annotated, Any
+from uuid import UUID
 
 import asyncpg
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
 
+from ._json import ORJSONResponse, decode_jsonb, dumps, encode_jsonb
 from .graph import AgentGraph
+from .jobs import annotation_records
 from .mast import RuleBasedClassifier
 from .metrics import compute_trace_metrics
 
-router = APIRouter(prefix="/api", tags=["analysis"])
+router = APIRouter(prefix="/api", tags=["analysis"], default_response_class=ORJSONResponse)
 
-# Global database pool (will be injected by server)
+# Global database pools (will be injected by server); handlers receive them
+# through the get_db/get_write_db dependencies
 _db_pool: asyncpg.Pool | None = None
+_db_write_pool: asyncpg.Pool | None = None
 
 
-def set_db_pool(pool: asyncpg.Pool) -> None:
-    """Set the database connection pool for API handlers."""
-    global _db_pool
+def set_db_pool(pool: asyncpg.Pool, write_pool: asyncpg.Pool | None = None) -> None:
+    """
+    Set the database connection pools for API handlers.
+
+    Args:
+        pool: Pool for read queries, ideally created with create_read_pool
+        write_pool: Pool for handlers that write; defaults to pool
+    """
+    global _db_pool, _db_write_pool
     _db_pool = pool
+    _db_write_pool = write_pool
 
 
-def get_db() -> asyncpg.Pool:
-    """Get database pool or raise error if not initialized."""
+async def get_db() -> asyncpg.Pool:
+    """Dependency to get the database pool or raise error if not initialized."""
     if _db_pool is None:
         raise HTTPException(status_code=500, detail="Database not initialized")
     return _db_pool
 
 
+async def get_write_db(db: asyncpg.Pool = Depends(get_db)) -> asyncpg.Pool:
+    """Dependency to get the pool for writes, falling back to the read pool."""
+    if _db_write_pool is not None:
+        return _db_write_pool
+    return db
+
+
+# Session settings for read connections, sent as startup parameters. The pool
+# runs RESET ALL whenever a connection is released, which restores startup
+# values; anything SET later in the session would silently revert after the
+# connection's first use.
+READ_SERVER_SETTINGS = {
+    # JIT is left to the expensive JSONB aggregates
+    "jit": "on",
+    "jit_above_cost": "100000",
+    # Sorts and hashes for 1000-row pages fit in memory instead of spilling
+    "work_mem": "64MB",
+    # The session refuses writes so a read pool can't be misused by a write path
+    "default_transaction_read_only": "on",
+}
+
+
+async def init_read_connection(conn: asyncpg.Connection) -> None:
+    """
+    Register client-side codecs on a read connection when the pool opens it.
+
+    JSONB columns are decoded by orjson from the binary wire format, so
+    callers get dicts rather than JSON text to parse again. Codecs live in
+    the client, so they survive the pool's reset on release.
+    """
+    await conn.set_type_codec(
+        "jsonb",
+        encoder=encode_jsonb,
+        decoder=decode_jsonb,
+        schema="pg_catalog",
+        format="binary",
+    )
+
+
+async def create_read_pool(dsn: str, **pool_kwargs: Any) -> asyncpg.Pool:
+    """
+    Create a read-only, session-tuned pool for the API handlers.
+
+    Args:
+        dsn: PostgreSQL connection string
+        **pool_kwargs: Extra asyncpg.create_pool arguments (sizes, timeouts)
+
+    Returns:
+        Pool whose connections use READ_SERVER_SETTINGS and init_read_connection
+    """
+    return await asyncpg.create_pool(
+        dsn,
+        server_settings=READ_SERVER_SETTINGS,
+        init=init_read_connection,
+        **pool_kwargs,
+    )
+
+
+# Hot-path statements are kept as module constants so every call sends the
+# same query text and hits asyncpg's per-connection prepared statement cache
+# instead of being re-parsed and re-planned.
+_TRACE_EXISTS_SQL = "SELECT EXISTS(SELECT 1 FROM traces WHERE trace_id = $1)"
+
+_GET_TRACE_SQL = "SELECT * FROM traces WHERE trace_id = $1"
+
+_GET_TRACE_DETAIL_SQL = """
+    SELECT
+        trace_id, name, status, start_time, end_time, metadata,
+        total_tokens, total_cost_usd, agent_count, span_count
+    FROM traces
+    WHERE trace_id = $1
+"""
+
+_SPAN_COLUMNS = """
+    span_id, trace_id, parent_span_id, agent_id, name, kind, status,
+    start_time, end_time, model, input, output, error,
+    attributes, input_tokens, output_tokens, cost_usd
+"""
+
+# span_count is trigger-maintained and NOT NULL, so a NULL result means the
+# trace doesn't exist: one lookup covers the existence check and the total
+_TRACE_SPAN_COUNT_SQL = "SELECT span_count FROM traces WHERE trace_id = $1"
+
+# Span pages are rendered to JSON by Postgres one row at a time and streamed
+# out as-is, so large JSONB payloads are never decoded into Python objects
+_SPAN_ROW_JSON = """
+    SELECT row_to_json(p)::text AS span, p.start_time, p.span_id
+    FROM ({page}) p
+    ORDER BY p.start_time, p.span_id
+"""
+
+_TRACE_SPANS_PAGE_SQL = _SPAN_ROW_JSON.format(
+    page=f"""
+        SELECT {_SPAN_COLUMNS}
+        FROM spans
+        WHERE trace_id = $1
+        ORDER BY start_time, span_id
+        LIMIT $2 OFFSET $3
+    """,
+)
+
+_TRACE_SPANS_SEEK_SQL = _SPAN_ROW_JSON.format(
+    page=f"""
+        SELECT {_SPAN_COLUMNS}
+        FROM spans
+        WHERE trace_id = $1 AND (start_time, span_id) > ($2, $3)
+        ORDER BY start_time, span_id
+        LIMIT $4
+    """,
+)
+
+# Below this planner estimate, list_traces counts exactly instead
+_EXACT_TOTAL_THRESHOLD = 10_000
+
+# Rows pulled from the server-side cursor per round-trip, and flushed per chunk
+_SPAN_STREAM_BATCH = 256
+
+_CLASSIFY_SPANS_SQL = """
+    SELECT
+        span_id, parent_span_id, agent_id, name, kind, status,
+        start_time, end_time, model, input, output, error,
+        attributes, input_tokens, output_tokens, cost_usd
+    FROM spans
+    WHERE trace_id = $1
+    ORDER BY start_time
+"""
+
+_TRACE_AGENTS_SQL = """
+    SELECT DISTINCT a.agent_id, a.name, a.role, a.model, a.framework, a.config
+    FROM agents a
+    JOIN spans s ON s.agent_id = a.agent_id
+    WHERE s.trace_id = $1
+"""
+
+_ANNOTATION_COLUMNS = [
+    "annotation_id",
+    "trace_id",
+    "span_id",
+    "agent_id",
+    "failure_mode",
+    "category",
+    "confidence",
+    "reasoning",
+]
+
+_GET_SPAN_SQL = """
+    SELECT
+        s.span_id, s.trace_id, s.parent_span_id, s.agent_id,
+        s.name, s.kind, s.status, s.start_time, s.end_time,
+        s.model, s.input, s.output, s.error, s.attributes,
+        s.input_tokens, s.output_tokens, s.cost_usd,
+        a.name as agent_name, a.role as agent_role
+    FROM spans s
+    LEFT JOIN agents a ON s.agent_id = a.agent_id
+    WHERE s.span_id = $1
+"""
+
+
+async def _trace_exists(conn: asyncpg.Connection, trace_id: UUID) -> bool:
+    """Check whether a trace exists."""
+    return bool(await conn.fetchval(_TRACE_EXISTS_SQL, trace_id))
+
+
+async def _pooled(db: asyncpg.Pool, method: str, query: str, *args: Any) -> Any:
+    """Run a single query on its own pooled connection."""
+    async with db.acquire() as conn:
+        return await getattr(conn, method)(query, *args)
+
+
+async def _estimate_count(conn: asyncpg.Connection, where_clause: str, params: list[Any]) -> int:
+    """Estimate the rows matching a traces filter from the planner, without scanning."""
+    plan = await conn.fetchval(
+        f"EXPLAIN (FORMAT JSON) SELECT 1 FROM traces {where_clause}", *params
+    )
+    return int(json.loads(plan)[0]["Plan"]["Plan Rows"])
+
+
+def _encode_cursor(start_time: datetime, row_id: Any) -> str:
+    """Encode a (start_time, id) keyset position as an opaque cursor."""
+    raw = json.dumps([start_time.isoformat(), str(row_id)])
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> tuple[datetime, str]:
+    """Decode a cursor produced by _encode_cursor, or raise a 400."""
+    try:
+        start_time, row_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return datetime.fromisoformat(start_time), str(row_id)
+    except (ValueError, TypeError) as e:
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor") from e
+
+
+class TraceListParams(BaseModel):
+    """Query parameters accepted by GET /api/traces."""
+
+    limit: int = Field(50, ge=1, le=1000, description="Number of traces to return")
+    offset: int = Field(0, ge=0, description="Number of traces to skip")
+    cursor: str | None = Field(None, description="Cursor from a previous page's next_cursor")
+    status: str | None = Field(None, description="Filter by status (running, completed, failed)")
+    start_time: datetime | None = Field(None, description="Filter traces after this time")
+    end_time: datetime | None = Field(None, description="Filter traces before this time")
+    metadata: str | None = Field(
+        None, description='Filter by metadata containment, as a JSON object (e.g. {"env": "prod"})'
+    )
+    exact_total: bool = Field(False, description="Always count the total exactly")
+
+
 @router.get("/traces")
 async def list_traces(
-    limit: int = Query(50, ge=1, le=1000, description="Number of traces to return"),
-    offset: int = Query(0, ge=0, description="Number of traces to skip"),
-    status: str | None = Query(None, description="Filter by status (running, completed, failed)"),
-    start_time: datetime | None = Query(None, description="Filter traces after this time"),
-    end_time: datetime | None = Query(None, description="Filter traces before this time"),
-) -> dict[str, Any]:
+    query: Annotated[TraceListParams, Query()],
+    db: asyncpg.Pool = Depends(get_db),
+) -> ORJSONResponse:
     """
     List traces with pagination and filtering.
 
+    JSONB filters are always emitted as `@>` containment predicates; the
+    `jsonb_path_ops` GIN index on traces.metadata only serves `@>`, never
+    `->`/`->>` equality.
+
+    Pages can be walked either by offset or by passing the previous page's
+    `next_cursor`, but not both (422). Cursor pages seek on (start_time,
+    trace_id) instead of discarding `offset` rows, and skip the total count
+    (returned as null).
+
+    Offset pages report an exact total only when the planner estimates fewer
+    than 10,000 matching traces or `exact_total` is set; otherwise `total` is
+    the planner's estimate and `total_exact` is false.
+
     Returns:
         Dictionary with traces list, total count, and pagination info
     """
-    db = get_db()
+    if query.cursor and query.offset:
+        raise HTTPException(status_code=422, detail="offset cannot be combined with cursor")
+    cursor_key = _decode_cursor(query.cursor) if query.cursor else None
+
+    metadata_filter = None
+    if query.metadata:
+        try:
+            metadata_filter = json.loads(query.metadata)
+        except json.JSONDecodeError:
+            metadata_filter = None
+        if not isinstance(metadata_filter, dict):
+            raise HTTPException(status_code=400, detail="metadata must be a JSON object")
 
     # Build query with filters
     conditions = []
     params: list[Any] = []
     param_idx = 1
 
-    if status:
+    if query.status:
         conditions.append(f"status = ${param_idx}")
-        params.append(status)
+        params.append(query.status)
         param_idx += 1
 
-    if start_time:
+    if query.start_time:
         conditions.append(f"start_time >= ${param_idx}")
-        params.append(start_time)
+        params.append(query.start_time)
         param_idx += 1
 
-    if end_time:
+    if query.end_time:
         conditions.append(f"end_time <= ${param_idx}")
-        params.append(end_time)
+        params.append(query.end_time)
+        param_idx += 1
+
+    if metadata_filter:
+        # Bound as text and cast, so the filter doesn't depend on whether the
+        # connection has a jsonb codec registered
+        conditions.append(f"metadata @> ${param_idx}::text::jsonb")
+        params.append(dumps(metadata_filter).decode())
         param_idx += 1
 
     where_clause = f"WHERE {' AND '.join(conditions)}" if conditions else ""
 
+    filter_params = list(params)
+    filter_where_clause = where_clause
+
+    if cursor_key is not None:
+        conditions.append(f"(t.start_time, t.trace_id) < (${param_idx}, ${param_idx + 1})")
+        params.extend(cursor_key)
+        param_idx += 2
+        where_clause = f"WHERE {' AND '.join(conditions)}"
+        pagination = f"LIMIT ${param_idx}"
+        params.append(query.limit)
+    else:
+        pagination = f"LIMIT ${param_idx} OFFSET ${param_idx + 1}"
+        params.extend([query.limit, query.offset])
+
     async with db.acquire() as conn:
-        # Get total count
-        count_query = f"SELECT COUNT(*) FROM traces {where_clause}"
-        total = await conn.fetchval(count_query, *params)
+        # Cursor pages skip the total. Offset pages take the planner's row
+        # estimate unless it is small enough (or exact_total was asked for) to
+        # count exactly, in which case the total rides along as a window over
+        # the filtered set in the page query itself.
+        total = None
+        total_exact = False
+        if cursor_key is None:
+            if not query.exact_total:
+                total = await _estimate_count(conn, filter_where_clause, filter_params)
+            # total is only unset here when exact_total was asked for
+            total_exact = total is None or total < _EXACT_TOTAL_THRESHOLD
+        total_column = ",\n                COUNT(*) OVER () AS _total" if total_exact else ""
 
         # Get paginated results
         list_query = f"""
@@ -83,119 +359,111 @@ async def list_traces(
                 t.start_time,
                 t.end_time,
                 t.metadata,
-                t.total_tokens,
-                t.total_cost_usd,
-                t.agent_count,
-                (SELECT COUNT(*) FROM spans WHERE trace_id = t.trace_id) as span_count
+                COALESCE(t.total_tokens, 0) AS total_tokens,
+                COALESCE(t.total_cost_usd, 0.0) AS total_cost_usd,
+                COALESCE(t.agent_count, 0) AS agent_count,
+                t.span_count{total_column}
             FROM traces t
             {where_clause}
-            ORDER BY t.start_time DESC
-            LIMIT ${param_idx} OFFSET ${param_idx + 1}
+            ORDER BY t.start_time DESC, t.trace_id DESC
+            {pagination}
         """
-        params.extend([limit, offset])
 
         rows = await conn.fetch(list_query, *params)
 
-        traces = [
-            {
-                "trace_id": row["trace_id"],
-                "name": row["name"],
-                "status": row["status"],
-                "start_time": row["start_time"].isoformat() if row["start_time"] else None,
-                "end_time": row["end_time"].isoformat() if row["end_time"] else None,
-                "metadata": row["metadata"],
-                "total_tokens": row["total_tokens"] or 0,
-                "total_cost_usd": float(row["total_cost_usd"]) if row["total_cost_usd"] else 0.0,
-                "agent_count": row["agent_count"] or 0,
-                "span_count": row["span_count"] or 0,
-            }
-            for row in rows
-        ]
-
-    return {
-        "traces": traces,
-        "total": total,
-        "limit": limit,
-        "offset": offset,
-    }
+        if total_exact:
+            if rows:
+                total = rows[0]["_total"]
+            elif query.offset:
+                # Paged past the end: no row to read the window total from
+                count_query = f"SELECT COUNT(*) FROM traces {filter_where_clause}"
+                total = await conn.fetchval(count_query, *filter_params)
+            else:
+                total = 0
+
+    next_cursor = None
+    if len(rows) == query.limit:
+        next_cursor = _encode_cursor(rows[-1]["start_time"], rows[-1]["trace_id"])
+
+    # Records are handed to orjson as-is; it formats datetimes and UUIDs natively
+    return ORJSONResponse(
+        {
+            "traces": rows,
+            "total": total,
+            "total_exact": total_exact,
+            "limit": query.limit,
+            "offset": query.offset,
+            "next_cursor": next_cursor,
+        }
+    )
 
 
 @router.get("/traces/{trace_id}")
 async def get_trace(
-    trace_id: str,
+    trace_id: UUID,
     include_graph: bool = Query(False, description="Include agent communication graph"),
-) -> dict[str, Any]:
+    db: asyncpg.Pool = Depends(get_db),
+) -> ORJSONResponse:
     """
     Get detailed information about a specific trace.
 
     Args:
         trace_id: Trace ID
         include_graph: Whether to include the agent communication graph
+        db: Database pool
 
     Returns:
         Trace details with optional graph
     """
-    db = get_db()
-
+    # Everything the detail view needs is on the trace row, so this is a
+    # single lookup; the connection is released before any graph work
     async with db.acquire() as conn:
-        # Get trace
-        trace = await conn.fetchrow("SELECT * FROM traces WHERE trace_id = $1", trace_id)
-
-        if not trace:
-            raise HTTPException(status_code=404, detail="Trace not found")
-
-        # Get span count and agent count
-        counts = await conn.fetchrow(
-            """
-            SELECT
-                COUNT(*) as span_count,
-                COUNT(DISTINCT agent_id) as agent_count
-            FROM spans
-            WHERE trace_id = $1
-            """,
-            trace_id,
-        )
+        trace = await conn.fetchrow(_GET_TRACE_DETAIL_SQL, trace_id)
+
+    if not trace:
+        raise HTTPException(status_code=404, detail="Trace not found")
+
+    result = {
+        "trace_id": trace["trace_id"],
+        "name": trace["name"],
+        "status": trace["status"],
+        "start_time": trace["start_time"],
+        "end_time": trace["end_time"],
+        "metadata": trace["metadata"],
+        "total_tokens": trace["total_tokens"] or 0,
+        "total_cost_usd": trace["total_cost_usd"] or 0.0,
+        # Both counters are trigger-maintained on the trace row
+        "span_count": trace["span_count"],
+        "agent_count": trace["agent_count"] or 0,
+    }
 
-        result = {
-            "trace_id": trace["trace_id"],
-            "name": trace["name"],
-            "status": trace["status"],
-            "start_time": trace["start_time"].isoformat() if trace["start_time"] else None,
-            "end_time": trace["end_time"].isoformat() if trace["end_time"] else None,
-            "metadata": trace["metadata"],
-            "total_tokens": trace["total_tokens"] or 0,
-            "total_cost_usd": float(trace["total_cost_usd"]) if trace["total_cost_usd"] else 0.0,
-            "span_count": counts["span_count"],
-            "agent_count": trace["agent_count"] or counts["agent_count"],
-        }
+    # Optionally include graph
+    if include_graph:
+        graph = await AgentGraph.from_trace(trace_id, db)
+        result["graph"] = graph.to_dict()
 
-        # Optionally include graph
-        if include_graph:
-            graph = await AgentGraph.from_trace(trace_id, db)
-            result["graph"] = graph.to_dict()
-
-    return result
+    # Datetimes and UUIDs are left for orjson to format natively
+    return ORJSONResponse(result)
 
 
 @router.get("/traces/{trace_id}/graph")
-async def get_trace_graph(trace_id: str) -> dict[str, Any]:
+async def get_trace_graph(
+    trace_id: UUID,
+    db: asyncpg.Pool = Depends(get_db),
+) -> dict[str, Any]:
     """
     Get agent communication graph for a trace.
 
     Args:
         trace_id: Trace ID
+        db: Database pool
 
     Returns:
         Graph with nodes, edges, and metrics
     """
-    db = get_db()
-
     # Verify trace exists
     async with db.acquire() as conn:
-        exists = await conn.fetchval(
-            "SELECT EXISTS(SELECT 1 FROM traces WHERE trace_id = $1)", trace_id
-        )
-        if not exists:
+        if not await _trace_exists(conn, trace_id):
             raise HTTPException(status_code=404, detail="Trace not found")
 
     # Build and return graph
@@ -213,24 +481,23 @@ async def get_trace_graph(trace_id: str) -> dict[str, Any]:
 
 
 @router.get("/traces/{trace_id}/failures")
-async def get_trace_failures(trace_id: str) -> dict[str, Any]:
+async def get_trace_failures(
+    trace_id: UUID,
+    db: asyncpg.Pool = Depends(get_db),
+) -> ORJSONResponse:
     """
     Get failure annotations for a trace.
 
     Args:
         trace_id: Trace ID
+        db: Database pool
 
     Returns:
         List of failure annotations
     """
-    db = get_db()
-
     async with db.acquire() as conn:
         # Verify trace exists
-        exists = await conn.fetchval(
-            "SELECT EXISTS(SELECT 1 FROM traces WHERE trace_id = $1)", trace_id
-        )
-        if not exists:
+        if not await _trace_exists(conn, trace_id):
             raise HTTPException(status_code=404, detail="Trace not found")
 
         # Get failure annotations
@@ -252,131 +519,98 @@ async def get_trace_failures(trace_id: str) -> dict[str, Any]:
             trace_id,
         )
 
-        result_annotations = [
-            {
-                "annotation_id": ann["annotation_id"],
-                "span_id": ann["span_id"],
-                "agent_id": ann["agent_id"],
-                "failure_mode": ann["failure_mode"],
-                "category": ann["category"],
-                "confidence": float(ann["confidence"]),
-                "reasoning": ann["reasoning"],
-                "created_at": ann["created_at"].isoformat(),
-            }
-            for ann in annotations
-        ]
-
-    return {
-        "trace_id": trace_id,
-        "annotations": result_annotations,
-        "count": len(result_annotations),
-    }
+    # The selected columns are the response fields, so records go to orjson
+    # as-is; confidence decodes from NUMERIC and is emitted as a float
+    return ORJSONResponse(
+        {
+            "trace_id": trace_id,
+            "annotations": annotations,
+            "count": len(annotations),
+        }
+    )
 
 
 @router.get("/traces/{trace_id}/metrics")
-async def get_trace_metrics(trace_id: str) -> dict[str, Any]:
+async def get_trace_metrics(
+    trace_id: UUID,
+    db: asyncpg.Pool = Depends(get_db),
+) -> dict[str, Any]:
     """
     Get aggregated metrics for a trace.
 
     Args:
         trace_id: Trace ID
+        db: Database pool
 
     Returns:
         Trace metrics including tokens, cost, latency breakdowns
     """
-    db = get_db()
+    # The existence check and the metrics query are independent, so run them
+    # concurrently on separate pooled connections
+    exists, metrics = await asyncio.gather(
+        _pooled(db, "fetchval", _TRACE_EXISTS_SQL, trace_id),
+        compute_trace_metrics(trace_id, db),
+    )
+    if not exists:
+        raise HTTPException(status_code=404, detail="Trace not found")
 
-    # Verify trace exists
-    async with db.acquire() as conn:
-        exists = await conn.fetchval(
-            "SELECT EXISTS(SELECT 1 FROM traces WHERE trace_id = $1)", trace_id
-        )
-        if not exists:
-            raise HTTPException(status_code=404, detail="Trace not found")
-
-    # Compute and return metrics
-    metrics = await compute_trace_metrics(trace_id, db)
     return metrics.to_dict()
 
 
 @router.post("/traces/{trace_id}/classify")
-async def classify_trace_failures(trace_id: str) -> dict[str, Any]:
+async def classify_trace_failures(
+    trace_id: UUID,
+    db: asyncpg.Pool = Depends(get_db),
+    write_db: asyncpg.Pool = Depends(get_write_db),
+) -> dict[str, Any]:
     """
     Run failure classification on a trace and store results.
 
     Args:
         trace_id: Trace ID
+        db: Database pool for the reads
+        write_db: Pool the annotations are written through
 
     Returns:
         Classification results
     """
-    db = get_db()
-
-    async with db.acquire() as conn:
-        # Get trace
-        trace = await conn.fetchrow("SELECT * FROM traces WHERE trace_id = $1", trace_id)
-        if not trace:
-            raise HTTPException(status_code=404, detail="Trace not found")
-
-        # Get spans
-        span_rows = await conn.fetch(
-            """
-            SELECT
-                span_id, parent_span_id, agent_id, name, kind, status,
-                start_time, end_time, model, input, output, error,
-                attributes, input_tokens, output_tokens, cost_usd
-            FROM spans
-            WHERE trace_id = $1
-            ORDER BY start_time
-            """,
-            trace_id,
-        )
-
-        spans = [dict(row) for row in span_rows]
-
-        # Get agents
-        agent_rows = await conn.fetch(
-            """
-            SELECT DISTINCT a.agent_id, a.name, a.role, a.model, a.framework, a.config
-            FROM agents a
-            JOIN spans s ON s.agent_id = a.agent_id
-            WHERE s.trace_id = $1
-            """,
-            trace_id,
-        )
-
-        agents = {row["agent_id"]: dict(row) for row in agent_rows}
-
-        # Run classifier
-        classifier = RuleBasedClassifier()
-        trace_dict = dict(trace)
-        results = classifier.classify(trace_dict, spans, agents)
-
-        # Store results in database
-        stored_annotations = []
-        for result in results:
-            annotation_id = await conn.fetchval(
-                """
-                INSERT INTO failure_annotations
-                (trace_id, span_id, agent_id, failure_mode, category, confidence, reasoning)
-                VALUES ($1, $2, $3, $4, $5, $6, $7)
-                RETURNING annotation_id
-                """,
-                trace_id,
-                result.span_id,
-                result.agent_id,
-                result.failure_mode,
-                result.category.value,
-                result.confidence,
-                result.reasoning,
-            )
-
-            stored_annotations.append(
-                {
-                    "annotation_id": annotation_id,
-                    **result.to_dict(),
-                }
-            )
+    # The three reads are independent, so run them concurrently on separate
+    # pooled connections rather than paying three sequential round-trips
+    trace, span_rows, agent_rows = await asyncio.gather(
+        _pooled(db, "fetchrow", _GET_TRACE_SQL, trace_id),
+        _pooled(db, "fetch", _CLASSIFY_SPANS_SQL, trace_id),
+        _pooled(db, "fetch", _TRACE_AGENTS_SQL, trace_id),
+    )
+    if not trace:
+        raise HTTPException(status_code=404, detail="Trace not found")
+
+    # Records are read-only mappings, which is all the rules need
+    agents = {row["agent_id"]: row for row in agent_rows}
+
+    # Run classifier
+    classifier = RuleBasedClassifier()
+    results = classifier.classify(trace, span_rows, agents)
+
+    # Ids are generated client-side so all annotations go out in a single COPY
+    # instead of one INSERT ... RETURNING round-trip per result
+    records = annotation_records(trace_id, results)
+
+    if records:
+        async with write_db.acquire() as conn:
+            async with conn.transaction():
+                await conn.copy_records_to_table(
+                    "failure_annotations",
+                    records=records,
+                    columns=_ANNOTATION_COLUMNS,
+                )
+
+    stored_annotations = [
+        {
+            "annotation_id": annotation_id,
+            **result.to_dict(),
+        }
+        for (annotation_id, *_), result in zip(records, results, strict=True)
+    ]
 
     return {
         "trace_id": trace_id,
@@ -387,10 +621,12 @@ async def classify_trace_failures(trace_id: str) -> dict[str, Any]:
 
 @router.get("/traces/{trace_id}/spans")
 async def list_trace_spans(
-    trace_id: str,
+    trace_id: UUID,
     limit: int = Query(100, ge=1, le=1000, description="Number of spans to return"),
     offset: int = Query(0, ge=0, description="Number of spans to skip"),
-) -> dict[str, Any]:
+    cursor: str | None = Query(None, description="Cursor from a previous page's next_cursor"),
+    db: asyncpg.Pool = Depends(get_db),
+) -> StreamingResponse:
     """
     List spans for a trace with pagination.
 
@@ -398,131 +634,138 @@ async def list_trace_spans(
         trace_id: Trace ID
         limit: Max number of spans to return
         offset: Number of spans to skip
+        cursor: Keyset cursor on (start_time, span_id); skips the total count
+            and cannot be combined with a non-zero offset
+        db: Database pool
 
     Returns:
         List of spans with pagination info
     """
-    db = get_db()
+    if cursor and offset:
+        raise HTTPException(status_code=422, detail="offset cannot be combined with cursor")
+    cursor_key = _decode_cursor(cursor) if cursor else None
 
     async with db.acquire() as conn:
-        # Verify trace exists
-        exists = await conn.fetchval(
-            "SELECT EXISTS(SELECT 1 FROM traces WHERE trace_id = $1)", trace_id
-        )
-        if not exists:
-            raise HTTPException(status_code=404, detail="Trace not found")
-
-        # Get total count
-        total = await conn.fetchval("SELECT COUNT(*) FROM spans WHERE trace_id = $1", trace_id)
-
-        # Get paginated spans
-        spans = await conn.fetch(
-            """
-            SELECT
-                span_id, trace_id, parent_span_id, agent_id, name, kind, status,
-                start_time, end_time, model, input, output, error,
-                attributes, input_tokens, output_tokens, cost_usd
-            FROM spans
-            WHERE trace_id = $1
-            ORDER BY start_time
-            LIMIT $2 OFFSET $3
-            """,
-            trace_id,
-            limit,
-            offset,
-        )
+        span_count = await conn.fetchval(_TRACE_SPAN_COUNT_SQL, trace_id)
+    if span_count is None:
+        raise HTTPException(status_code=404, detail="Trace not found")
+    total = span_count if cursor_key is None else None
+
+    args: list[Any]
+    if cursor_key is None:
+        query, args = _TRACE_SPANS_PAGE_SQL, [trace_id, limit, offset]
+    else:
+        query, args = _TRACE_SPANS_SEEK_SQL, [trace_id, *cursor_key, limit]
+
+    # Read the first chunk before committing to a 200, so a failure opening
+    # the cursor or fetching the first rows surfaces as a 5xx instead of a
+    # truncated body
+    stream = _stream_span_page(db, query, args, trace_id, total, limit, offset)
+    first_chunk = await anext(stream)
+
+    return StreamingResponse(_prepend(first_chunk, stream), media_type="application/json")
+
+
+async def _prepend(first: bytes, rest: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """Yield an already-read chunk, then the rest of the stream."""
+    yield first
+    async for chunk in rest:
+        yield chunk
+
+
+async def _stream_span_page(
+    db: asyncpg.Pool,
+    query: str,
+    args: list[Any],
+    trace_id: UUID,
+    total: int | None,
+    limit: int,
+    offset: int,
+) -> AsyncIterator[bytes]:
+    """
+    Stream a span page as JSON, reading rows through a server-side cursor.
 
-        span_list = [
-            {
-                "span_id": span["span_id"],
-                "trace_id": span["trace_id"],
-                "parent_span_id": span["parent_span_id"],
-                "agent_id": span["agent_id"],
-                "name": span["name"],
-                "kind": span["kind"],
-                "status": span["status"],
-                "start_time": span["start_time"].isoformat() if span["start_time"] else None,
-                "end_time": span["end_time"].isoformat() if span["end_time"] else None,
-                "model": span["model"],
-                "input": span["input"],
-                "output": span["output"],
-                "error": span["error"],
-                "attributes": span["attributes"],
-                "input_tokens": span["input_tokens"],
-                "output_tokens": span["output_tokens"],
-                "cost_usd": float(span["cost_usd"]) if span["cost_usd"] else None,
-            }
-            for span in spans
-        ]
+    The opening of the JSON object rides on the first chunk, so nothing is
+    yielded until the first batch of rows has been read.
+    """
+    head = b'{"trace_id":' + dumps(trace_id) + b',"spans":['
 
-    return {
-        "trace_id": trace_id,
-        "spans": span_list,
-        "total": total,
-        "limit": limit,
-        "offset": offset,
-    }
+    count = 0
+    last_key = None
+    async with db.acquire() as conn:
+        # Server-side cursors only live inside a transaction
+        async with conn.transaction(readonly=True):
+            chunk: list[bytes] = []
+            async for row in conn.cursor(query, *args, prefetch=_SPAN_STREAM_BATCH):
+                chunk.append(row["span"].encode())
+                count += 1
+                last_key = (row["start_time"], row["span_id"])
+                if len(chunk) == _SPAN_STREAM_BATCH:
+                    yield head + (b"," if count > len(chunk) else b"") + b",".join(chunk)
+                    head = b""
+                    chunk = []
+            if chunk:
+                yield head + (b"," if count > len(chunk) else b"") + b",".join(chunk)
+                head = b""
+
+    next_cursor = None
+    if count == limit and last_key is not None:
+        next_cursor = _encode_cursor(*last_key)
+
+    tail = {"total": total, "limit": limit, "offset": offset, "next_cursor": next_cursor}
+    yield head + b"]," + dumps(tail)[1:]
 
 
 @router.get("/spans/{span_id}")
-async def get_span(span_id: str) -> dict[str, Any]:
+async def get_span(
+    span_id: UUID,
+    db: asyncpg.Pool = Depends(get_db),
+) -> ORJSONResponse:
     """
     Get detailed information about a specific span.
 
     Args:
         span_id: Span ID
+        db: Database pool
 
     Returns:
         Span details
     """
-    db = get_db()
-
+    # The agent fields are joined into the same row, so one lookup covers
+    # the response; the connection is released before building it
     async with db.acquire() as conn:
-        span = await conn.fetchrow(
-            """
-            SELECT
-                s.span_id, s.trace_id, s.parent_span_id, s.agent_id,
-                s.name, s.kind, s.status, s.start_time, s.end_time,
-                s.model, s.input, s.output, s.error, s.attributes,
-                s.input_tokens, s.output_tokens, s.cost_usd,
-                a.name as agent_name, a.role as agent_role
-            FROM spans s
-            LEFT JOIN agents a ON s.agent_id = a.agent_id
-            WHERE s.span_id = $1
-            """,
-            span_id,
-        )
-
-        if not span:
-            raise HTTPException(status_code=404, detail="Span not found")
-
-        # Calculate duration
-        duration_ms = None
-        if span["start_time"] and span["end_time"]:
-            duration = span["end_time"] - span["start_time"]
-            duration_ms = duration.total_seconds() * 1000
-
-        result = {
-            "span_id": span["span_id"],
-            "trace_id": span["trace_id"],
-            "parent_span_id": span["parent_span_id"],
-            "agent_id": span["agent_id"],
-            "agent_name": span["agent_name"],
-            "agent_role": span["agent_role"],
-            "name": span["name"],
-            "kind": span["kind"],
-            "status": span["status"],
-            "start_time": span["start_time"].isoformat() if span["start_time"] else None,
-            "end_time": span["end_time"].isoformat() if span["end_time"] else None,
-            "duration_ms": duration_ms,
-            "model": span["model"],
-            "input": span["input"],
-            "output": span["output"],
-            "error": span["error"],
-            "attributes": span["attributes"],
-            "input_tokens": span["input_tokens"],
-            "output_tokens": span["output_tokens"],
-            "cost_usd": float(span["cost_usd"]) if span["cost_usd"] else None,
-        }
+        span = await conn.fetchrow(_GET_SPAN_SQL, span_id)
+
+    if not span:
+        raise HTTPException(status_code=404, detail="Span not found")
+
+    # Calculate duration
+    duration_ms = None
+    if span["start_time"] and span["end_time"]:
+        duration = span["end_time"] - span["start_time"]
+        duration_ms = duration.total_seconds() * 1000
+
+    result = {
+        "span_id": span["span_id"],
+        "trace_id": span["trace_id"],
+        "parent_span_id": span["parent_span_id"],
+        "agent_id": span["agent_id"],
+        "agent_name": span["agent_name"],
+        "agent_role": span["agent_role"],
+        "name": span["name"],
+        "kind": span["kind"],
+        "status": span["status"],
+        "start_time": span["start_time"],
+        "end_time": span["end_time"],
+        "duration_ms": duration_ms,
+        "model": span["model"],
+        "input": span["input"],
+        "output": span["output"],
+        "error": span["error"],
+        "attributes": span["attributes"],
+        "input_tokens": span["input_tokens"],
+        "output_tokens": span["output_tokens"],
+        "cost_usd": span["cost_usd"],
+    }
 
-    return result
+    return ORJSONResponse(result)
@@ -2,14 +2,15 @@
 
 from __future__ import annotations
 
+from collections import deque
 from dataclasses import dataclass, field
 from typing import Any
+from uuid import UUID
 
 import asyncpg
-import networkx as nx
 
 
-@dataclass
+@dataclass(slots=True)
 class AgentNode:
     """Node representing an agent in the communication graph."""
 
@@ -42,7 +43,7 @@ class AgentNode:
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class CommunicationEdge:
     """Edge representing communication between two agents."""
 
@@ -55,6 +56,10 @@ class CommunicationEdge:
     total_tokens_transferred: int = 0
     avg_latency_ms: float = 0.0
 
+    def __post_init__(self) -> None:
+        """Deduplicate message types once, keeping first-seen order."""
+        self.message_types = list(dict.fromkeys(self.message_types))
+
     def to_dict(self) -> dict[str, Any]:
         """Serialize edge to dictionary."""
         return {
@@ -62,7 +67,7 @@ class CommunicationEdge:
             "to_agent": self.to_agent,
             "metrics": {
                 "message_count": self.message_count,
-                "message_types": list(set(self.message_types)),
+                "message_types": list(self.message_types),
                 "total_tokens_transferred": self.total_tokens_transferred,
                 "avg_latency_ms": self.avg_latency_ms,
             },
@@ -74,12 +79,22 @@ class AgentGraph:
 
     def __init__(self):
         """Initialize an empty agent graph."""
-        self._graph: nx.DiGraph = nx.DiGraph()
         self._nodes: dict[str, AgentNode] = {}
         self._edges: dict[tuple[str, str], CommunicationEdge] = {}
 
+        # Topology as parallel arrays: agent ids by dense index, plus one
+        # (from, to) index pair per edge. Edges may name agents that were
+        # never added, so those get an index too. Degrees are counted per
+        # index as edges arrive, so they never need a sweep over the edges.
+        self._node_ids: list[str] = []
+        self._node_index: dict[str, int] = {}
+        self._from_idx: list[int] = []
+        self._to_idx: list[int] = []
+        self._in_degree: list[int] = []
+        self._out_degree: list[int] = []
+
     @classmethod
-    async def from_trace(cls, trace_id: str, db: asyncpg.Pool) -> AgentGraph:
+    async def from_trace(cls, trace_id: UUID | str, db: asyncpg.Pool) -> AgentGraph:
         """
         Build agent communication graph from stored trace data.
 
@@ -93,103 +108,87 @@ class AgentGraph:
         graph = cls()
 
         async with db.acquire() as conn:
-            # Fetch all agents involved in this trace
+            # Span metrics are kept on each agent row by a trigger on spans, so
+            # nodes come straight from agents without aggregating spans.
+            # Agents that never emitted a span get no node.
             agents = await conn.fetch(
                 """
-                SELECT DISTINCT a.agent_id, a.name, a.role, a.model, a.framework, a.config
-                FROM agents a
-                JOIN spans s ON s.agent_id = a.agent_id
-                WHERE s.trace_id = $1
+                SELECT
+                    agent_id,
+                    name,
+                    role,
+                    model,
+                    total_spans AS span_count,
+                    total_tokens,
+                    total_cost_usd,
+                    error_count,
+                    COALESCE(total_latency_ms / NULLIF(latency_span_count, 0), 0.0)
+                        AS avg_latency_ms
+                FROM agents
+                WHERE trace_id = $1 AND total_spans > 0
                 """,
                 trace_id,
             )
 
             # Build agent nodes with metrics
             for agent_row in agents:
-                agent_id = agent_row["agent_id"]
-
-                # Aggregate metrics for this agent from spans
-                metrics = await conn.fetchrow(
-                    """
-                    SELECT
-                        COUNT(*) as span_count,
-                        COALESCE(SUM(input_tokens + output_tokens), 0) as total_tokens,
-                        COALESCE(SUM(cost_usd), 0.0) as total_cost_usd,
-                        COALESCE(SUM(CASE WHEN status = 'error' THEN 1 ELSE 0 END), 0) as error_count,
-                        COALESCE(AVG(EXTRACT(EPOCH FROM (end_time - start_time)) * 1000), 0.0) as avg_latency_ms
-                    FROM spans
-                    WHERE trace_id = $1 AND agent_id = $2
-                    """,
-                    trace_id,
-                    agent_id,
-                )
-
                 node = AgentNode(
-                    agent_id=agent_id,
+                    agent_id=agent_row["agent_id"],
                     name=agent_row["name"],
                     role=agent_row["role"],
                     model=agent_row["model"],
-                    span_count=metrics["span_count"],
-                    total_tokens=metrics["total_tokens"],
-                    total_cost_usd=float(metrics["total_cost_usd"]),
-                    error_count=metrics["error_count"],
-                    avg_latency_ms=float(metrics["avg_latency_ms"]),
+                    span_count=agent_row["span_count"],
+                    total_tokens=agent_row["total_tokens"],
+                    total_cost_usd=agent_row["total_cost_usd"],
+                    error_count=agent_row["error_count"],
+                    avg_latency_ms=float(agent_row["avg_latency_ms"]),
                 )
                 graph.add_agent(node)
 
-            # Fetch inter-agent messages and build edges
-            messages = await conn.fetch(
+            # Aggregate inter-agent messages into one row per (from, to) pair.
+            # Tokens are a rough bytes/4 estimate of the serialized content
+            # (octet_length skips counting multibyte characters); latency is
+            # the mean gap between consecutive messages on the same pair.
+            edges = await conn.fetch(
                 """
+                WITH m AS (
+                    SELECT
+                        from_agent_id,
+                        to_agent_id,
+                        message_type,
+                        octet_length(content::text) AS content_bytes,
+                        timestamp - lag(timestamp) OVER (
+                            PARTITION BY from_agent_id, to_agent_id ORDER BY timestamp
+                        ) AS gap
+                    FROM agent_messages
+                    WHERE trace_id = $1
+                        AND from_agent_id IS NOT NULL
+                        AND to_agent_id IS NOT NULL
+                )
                 SELECT
-                    from_agent,
-                    to_agent,
-                    message_type,
-                    content,
-                    timestamp
-                FROM agent_messages
-                WHERE trace_id = $1 AND from_agent IS NOT NULL AND to_agent IS NOT NULL
-                ORDER BY timestamp
+                    from_agent_id AS from_agent,
+                    to_agent_id AS to_agent,
+                    COUNT(*) AS message_count,
+                    COALESCE(
+                        array_agg(DISTINCT message_type) FILTER (WHERE message_type IS NOT NULL),
+                        '{}'
+                    ) AS message_types,
+                    COALESCE(SUM(content_bytes) / 4, 0) AS total_tokens,
+                    COALESCE(EXTRACT(EPOCH FROM AVG(gap)) * 1000, 0.0) AS avg_latency_ms
+                FROM m
+                GROUP BY from_agent_id, to_agent_id
                 """,
                 trace_id,
             )
 
-            # Group messages by (from_agent, to_agent) pair
-            edge_data: dict[tuple[str, str], list[dict]] = {}
-            for msg in messages:
-                key = (msg["from_agent"], msg["to_agent"])
-                if key not in edge_data:
-                    edge_data[key] = []
-                edge_data[key].append(msg)
-
-            # Create edges with aggregated metrics
-            for (from_agent, to_agent), msgs in edge_data.items():
-                message_types = [msg["message_type"] for msg in msgs]
-
-                # Calculate total tokens from message content
-                total_tokens = 0
-                for msg in msgs:
-                    content = msg.get("content") or {}
-                    if isinstance(content, dict):
-                        # Rough estimate: count characters in content
-                        content_str = str(content)
-                        total_tokens += len(content_str) // 4  # Rough token estimate
-
-                # Calculate average latency (time between consecutive messages)
-                latencies = []
-                for i in range(1, len(msgs)):
-                    if msgs[i]["timestamp"] and msgs[i - 1]["timestamp"]:
-                        delta = msgs[i]["timestamp"] - msgs[i - 1]["timestamp"]
-                        latencies.append(delta.total_seconds() * 1000)
-
-                avg_latency = sum(latencies) / len(latencies) if latencies else 0.0
-
+            for edge_row in edges:
                 edge = CommunicationEdge(
-                    from_agent=from_agent,
-                    to_agent=to_agent,
-                    message_count=len(msgs),
-                    message_types=message_types,
-                    total_tokens_transferred=total_tokens,
-                    avg_latency_ms=avg_latency,
+                    from_agent=edge_row["from_agent"],
+                    to_agent=edge_row["to_agent"],
+                    message_count=edge_row["message_count"],
+                    message_types=edge_row["message_types"],
+                    total_tokens_transferred=edge_row["total_tokens"],
+                    avg_latency_ms=float(edge_row["avg_latency_ms"]),
                 )
                 graph.add_edge(edge)
 
@@ -198,13 +197,50 @@ class AgentGraph:
     def add_agent(self, node: AgentNode) -> None:
         """Add an agent node to the graph."""
         self._nodes[node.agent_id] = node
-        self._graph.add_node(node.agent_id, data=node)
+        self._index_of(node.agent_id)
 
     def add_edge(self, edge: CommunicationEdge) -> None:
         """Add a communication edge to the graph."""
         key = (edge.from_agent, edge.to_agent)
+        if key not in self._edges:
+            from_index = self._index_of(edge.from_agent)
+            to_index = self._index_of(edge.to_agent)
+            self._from_idx.append(from_index)
+            self._to_idx.append(to_index)
+            self._out_degree[from_index] += 1
+            self._in_degree[to_index] += 1
         self._edges[key] = edge
-        self._graph.add_edge(edge.from_agent, edge.to_agent, data=edge)
+
+    def _index_of(self, agent_id: str) -> int:
+        """Dense index of an agent, assigning the next one on first sight."""
+        index = self._node_index.get(agent_id)
+        if index is None:
+            index = self._node_index[agent_id] = len(self._node_ids)
+            self._node_ids.append(agent_id)
+            self._in_degree.append(0)
+            self._out_degree.append(0)
+        return index
+
+    def _successor_arrays(self) -> tuple[list[int], list[int]]:
+        """
+        CSR view of the edge arrays.
+
+        Returns:
+            (offsets, targets), where the successors of node v are
+            targets[offsets[v]:offsets[v + 1]]
+        """
+        n = len(self._node_ids)
+        offsets = [0] * (n + 1)
+        for from_index in self._from_idx:
+            offsets[from_index + 1] += 1
+        for v in range(n):
+            offsets[v + 1] += offsets[v]
+        targets = [0] * len(self._to_idx)
+        fill = offsets[:-1]
+        for from_index, to_index in zip(self._from_idx, self._to_idx, strict=True):
+            targets[fill[from_index]] = to_index
+            fill[from_index] += 1
+        return offsets, targets
 
     def to_dict(self) -> dict[str, Any]:
         """Serialize graph to dictionary for API responses."""
@@ -214,13 +250,51 @@ class AgentGraph:
             "metrics": {
                 "node_count": len(self._nodes),
                 "edge_count": len(self._edges),
-                "density": (nx.density(self._graph) if len(self._nodes) > 1 else 0.0),
-                "has_cycles": not nx.is_directed_acyclic_graph(self._graph)
-                if len(self._nodes) > 0
-                else False,
+                "density": self.density(),
+                "has_cycles": self.has_cycles(),
             },
         }
 
+    def has_cycles(self) -> bool:
+        """
+        Check whether any agents communicate in a loop.
+
+        Kahn's algorithm over the maintained in-degrees: repeatedly remove
+        agents with no remaining senders. Agents on or downstream of a cycle,
+        including one messaging itself, never run out of senders, so the
+        graph is cyclic iff some agent is never removed. Linear time, no
+        recursion.
+
+        Returns:
+            True if the graph contains a cycle
+        """
+        offsets, targets = self._successor_arrays()
+        in_degree = self._in_degree.copy()
+        ready = deque(v for v, degree in enumerate(in_degree) if degree == 0)
+        removed = 0
+
+        while ready:
+            v = ready.popleft()
+            removed += 1
+            for w in targets[offsets[v] : offsets[v + 1]]:
+                in_degree[w] -= 1
+                if in_degree[w] == 0:
+                    ready.append(w)
+
+        return removed != len(self._node_ids)
+
+    def density(self) -> float:
+        """
+        Fraction of possible directed agent pairs that communicate.
+
+        Returns:
+            Edge count over n * (n - 1), or 0.0 for fewer than two agents
+        """
+        if len(self._nodes) <= 1:
+            return 0.0
+        n = len(self._node_ids)
+        return len(self._from_idx) / (n * (n - 1))
+
     def find_bottlenecks(self) -> list[str]:
         """
         Identify agents with high in-degree (bottleneck agents).
@@ -231,14 +305,15 @@ class AgentGraph:
         if len(self._nodes) == 0:
             return []
 
-        in_degrees = dict(self._graph.in_degree())
-        if not in_degrees:
-            return []
-
-        avg_in_degree = sum(in_degrees.values()) / len(in_degrees)
+        # Every edge adds one to exactly one in-degree
+        avg_in_degree = len(self._from_idx) / len(self._node_ids)
         threshold = avg_in_degree * 2
 
-        bottlenecks = [agent_id for agent_id, degree in in_degrees.items() if degree > threshold]
+        bottlenecks = [
+            agent_id
+            for agent_id, degree in zip(self._node_ids, self._in_degree, strict=True)
+            if degree > threshold
+        ]
         return bottlenecks
 
     def find_isolated_agents(self) -> list[str]:
@@ -248,11 +323,15 @@ class AgentGraph:
         Returns:
             List of agent IDs with degree 0
         """
-        isolated = []
-        for agent_id in self._nodes:
-            if self._graph.degree(agent_id) == 0:
-                isolated.append(agent_id)
-        return isolated
+        # Agents only named by edges always have a degree, so every index
+        # with none belongs to an added node
+        return [
+            agent_id
+            for agent_id, in_degree, out_degree in zip(
+                self._node_ids, self._in_degree, self._out_degree, strict=True
+            )
+            if in_degree == 0 and out_degree == 0
+        ]
 
     def get_node(self, agent_id: str) -> AgentNode | None:
         """Get agent node by ID."""
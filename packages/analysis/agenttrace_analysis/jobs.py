@@ -4,16 +4,131 @@ from __future__ import annotations
 
 import asyncio
 import logging
+from datetime import UTC, datetime
+from decimal import Decimal
+from itertools import groupby
+from operator import itemgetter
 from typing import Any
+from uuid import UUID, uuid4
 
 import asyncpg
 
-from .mast import RuleBasedClassifier
+from .mast import ClassificationResult, RuleBasedClassifier
 
 logger = logging.getLogger(__name__)
 
+# Queries are module constants so every call sends byte-identical text and
+# hits asyncpg's per-connection prepared statement cache instead of being
+# parsed and planned again
+
+# Keep status = 'failed' as a literal so it matches
+# idx_traces_failed_by_start_time's predicate
+_UNCLASSIFIED_TRACES_SQL = """
+    SELECT t.trace_id, t.status
+    FROM traces t
+    WHERE t.status = 'failed'
+    AND NOT EXISTS (
+        SELECT 1 FROM failure_annotations fa
+        WHERE fa.trace_id = t.trace_id
+    )
+    ORDER BY t.start_time DESC
+    LIMIT $1
+"""
+
+# Alongside the newest-first pass above, periodic runs walk failed traces
+# oldest-first from a (start_time, trace_id) high-water mark, so most runs only
+# read traces that started since the last one. A trace can fail after
+# later-started traces were processed, which puts it below the mark, so the
+# job periodically rescans from the bottom. The plain start_time bound lets the
+# partial index do the range scan.
+_UNCLASSIFIED_TRACES_AFTER_SQL = """
+    SELECT t.trace_id, t.start_time
+    FROM traces t
+    WHERE t.status = 'failed'
+    AND t.start_time >= $2
+    AND (t.start_time, t.trace_id) > ($2, $3)
+    AND NOT EXISTS (
+        SELECT 1 FROM failure_annotations fa
+        WHERE fa.trace_id = t.trace_id
+    )
+    ORDER BY t.start_time, t.trace_id
+    LIMIT $1
+"""
+
+_BATCH_TRACES_SQL = "SELECT * FROM traces WHERE trace_id = ANY($1::uuid[])"
+
+_BATCH_SPANS_SQL = """
+    SELECT
+        trace_id, span_id, parent_span_id, agent_id, name, kind, status,
+        start_time, end_time, input, output, error,
+        attributes, input_tokens, output_tokens, cost_usd
+    FROM spans
+    WHERE trace_id = ANY($1::uuid[])
+    ORDER BY trace_id, start_time
+"""
+
+_BATCH_AGENTS_SQL = """
+    SELECT DISTINCT s.trace_id, a.agent_id, a.name, a.role, a.model, a.framework, a.config
+    FROM agents a
+    JOIN spans s ON s.agent_id = a.agent_id
+    WHERE s.trace_id = ANY($1::uuid[])
+    ORDER BY s.trace_id
+"""
+
+_TRACE_SQL = "SELECT * FROM traces WHERE trace_id = $1"
+
+_DELETE_ANNOTATIONS_SQL = "DELETE FROM failure_annotations WHERE trace_id = $1"
+
+_TRACE_SPANS_SQL = """
+    SELECT
+        span_id, parent_span_id, agent_id, name, kind, status,
+        start_time, end_time, input, output, error,
+        attributes, input_tokens, output_tokens, cost_usd
+    FROM spans
+    WHERE trace_id = $1
+    ORDER BY start_time
+"""
+
+_TRACE_AGENTS_SQL = """
+    SELECT DISTINCT a.agent_id, a.name, a.role, a.model, a.framework, a.config
+    FROM agents a
+    JOIN spans s ON s.agent_id = a.agent_id
+    WHERE s.trace_id = $1
+"""
+
+# annotation_id has no database default, so ids are generated client-side and
+# a whole trace's annotations go out in one pipelined executemany
+_INSERT_ANNOTATION_SQL = """
+    INSERT INTO failure_annotations
+    (annotation_id, trace_id, span_id, agent_id, failure_mode, category, confidence, reasoning)
+    VALUES ($1, $2, $3, $4, $5, $6, $7, $8)
+"""
+
+
+def annotation_records(trace_id: Any, results: list[ClassificationResult]) -> list[tuple[Any, ...]]:
+    """Build failure_annotations rows, with fresh ids, for classification results."""
+    return [
+        (
+            uuid4(),
+            trace_id,
+            result.span_id,
+            result.agent_id,
+            result.failure_mode,
+            result.category.value,
+            # confidence is DECIMAL(3, 2); str() keeps the float's short repr
+            Decimal(str(result.confidence)),
+            result.reasoning,
+        )
+        for result in results
+    ]
+
 
-async def classify_failed_traces(db: asyncpg.Pool, batch_size: int = 10) -> int:
+async def classify_failed_traces(
+    db: asyncpg.Pool,
+    batch_size: int = 10,
+    workers: int = 4,
+    classifier: RuleBasedClassifier | None = None,
+) -> int:
     """
     Find traces with status="failed" that have no annotations and classify them.
 
@@ -22,103 +137,90 @@ async def classify_failed_traces(db: asyncpg.Pool, batch_size: int = 10) -> int:
     Args:
         db: Database connection pool
         batch_size: Number of traces to process in one batch
+        workers: Maximum number of traces written concurrently; the pool
+            should allow at least this many connections
+        classifier: Classifier to reuse; a new one is built if omitted
 
     Returns:
         Number of traces classified
     """
     logger.info("Starting classification job for failed traces")
-    classifier = RuleBasedClassifier()
-    traces_classified = 0
+    classifier = classifier or RuleBasedClassifier()
 
     async with db.acquire() as conn:
         # Find failed traces without annotations
-        unclassified_traces = await conn.fetch(
-            """
-            SELECT t.trace_id, t.status
-            FROM traces t
-            WHERE t.status = 'failed'
-            AND NOT EXISTS (
-                SELECT 1 FROM failure_annotations fa
-                WHERE fa.trace_id = t.trace_id
-            )
-            ORDER BY t.start_time DESC
-            LIMIT $1
-            """,
-            batch_size,
-        )
+        unclassified_traces = await conn.fetch(_UNCLASSIFIED_TRACES_SQL, batch_size)
 
-        logger.info(f"Found {len(unclassified_traces)} unclassified failed traces")
-
-        for trace_row in unclassified_traces:
-            trace_id = trace_row["trace_id"]
-
-            try:
-                # Get trace details
-                trace = await conn.fetchrow("SELECT * FROM traces WHERE trace_id = $1", trace_id)
-
-                # Get spans
-                span_rows = await conn.fetch(
-                    """
-                    SELECT
-                        span_id, parent_span_id, agent_id, name, kind, status,
-                        start_time, end_time, input, output, error_message,
-                        attributes, input_tokens, output_tokens, cost_usd
-                    FROM spans
-                    WHERE trace_id = $1
-                    ORDER BY start_time
-                    """,
-                    trace_id,
-                )
+    logger.info(f"Found {len(unclassified_traces)} unclassified failed traces")
 
-                spans = [dict(row) for row in span_rows]
-
-                # Get agents
-                agent_rows = await conn.fetch(
-                    """
-                    SELECT DISTINCT a.agent_id, a.name, a.role, a.model, a.framework, a.config
-                    FROM agents a
-                    JOIN spans s ON s.agent_id = a.agent_id
-                    WHERE s.trace_id = $1
-                    """,
-                    trace_id,
-                )
+    trace_ids = [row["trace_id"] for row in unclassified_traces]
+    traces_classified = await _classify_batch(db, trace_ids, workers, classifier)
+
+    logger.info(f"Classification job complete: {traces_classified} traces processed")
+    return traces_classified
 
-                agents = {row["agent_id"]: dict(row) for row in agent_rows}
-
-                # Run classification
-                trace_dict = dict(trace)
-                results = classifier.classify(trace_dict, spans, agents)
-
-                # Store results
-                for result in results:
-                    await conn.execute(
-                        """
-                        INSERT INTO failure_annotations
-                        (trace_id, span_id, agent_id, failure_mode, category, confidence, reasoning)
-                        VALUES ($1, $2, $3, $4, $5, $6, $7)
-                        """,
-                        trace_id,
-                        result.span_id,
-                        result.agent_id,
-                        result.failure_mode,
-                        result.category.value,
-                        result.confidence,
-                        result.reasoning,
+
+async def _classify_batch(
+    db: asyncpg.Pool, trace_ids: list[Any], workers: int, classifier: RuleBasedClassifier
+) -> int:
+    """Load, classify and annotate a batch of traces; returns how many succeeded."""
+    if not trace_ids:
+        return 0
+
+    async with db.acquire() as conn:
+        # Load the whole batch in three queries instead of three per trace
+        trace_rows = await conn.fetch(_BATCH_TRACES_SQL, trace_ids)
+        span_rows = await conn.fetch(_BATCH_SPANS_SQL, trace_ids)
+        agent_rows = await conn.fetch(_BATCH_AGENTS_SQL, trace_ids)
+
+        # Records are read-only mappings, which is all the rules need, so
+        # they are grouped as-is rather than copied into dicts
+        traces_by_id = {row["trace_id"]: row for row in trace_rows}
+        spans_by_trace = {
+            trace_id: list(rows)
+            for trace_id, rows in groupby(span_rows, key=itemgetter("trace_id"))
+        }
+        agents_by_trace = {
+            trace_id: {row["agent_id"]: row for row in rows}
+            for trace_id, rows in groupby(agent_rows, key=itemgetter("trace_id"))
+        }
+
+    # Classify and store traces concurrently, each write on its own pooled
+    # connection; a connection is never shared between coroutines
+    semaphore = asyncio.Semaphore(workers)
+
+    async def classify_one(trace_id: Any) -> bool:
+        try:
+            # Run classification
+            results = classifier.classify(
+                traces_by_id[trace_id],
+                spans_by_trace.get(trace_id, []),
+                agents_by_trace.get(trace_id, {}),
+            )
+
+            # Store results
+            if results:
+                async with semaphore, db.acquire() as conn:
+                    await conn.executemany(
+                        _INSERT_ANNOTATION_SQL, annotation_records(trace_id, results)
                     )
 
-                traces_classified += 1
-                logger.info(f"Classified trace {trace_id}: found {len(results)} failures")
+            logger.info(f"Classified trace {trace_id}: found {len(results)} failures")
+            return True
 
-            except Exception as e:
-                logger.error(f"Error classifying trace {trace_id}: {e}", exc_info=True)
-                continue
+        except Exception as e:
+            logger.error(f"Error classifying trace {trace_id}: {e}", exc_info=True)
+            return False
 
-    logger.info(f"Classification job complete: {traces_classified} traces processed")
-    return traces_classified
+    outcomes = await asyncio.gather(*(classify_one(trace_id) for trace_id in trace_ids))
+    return sum(outcomes)
 
 
 async def classify_trace(
-    trace_id: str, db: asyncpg.Pool, overwrite: bool = False
+    trace_id: UUID | str,
+    db: asyncpg.Pool,
+    overwrite: bool = False,
+    classifier: RuleBasedClassifier | None = None,
 ) -> list[dict[str, Any]]:
     """
     Classify a specific trace and store annotations.
@@ -127,108 +229,136 @@ async def classify_trace(
         trace_id: Trace ID to classify
         db: Database connection pool
         overwrite: If True, delete existing annotations before classifying
+        classifier: Classifier to reuse; a new one is built if omitted
 
     Returns:
         List of stored annotation dictionaries
     """
-    classifier = RuleBasedClassifier()
+    classifier = classifier or RuleBasedClassifier()
 
     async with db.acquire() as conn:
         # Check if trace exists
-        trace = await conn.fetchrow("SELECT * FROM traces WHERE trace_id = $1", trace_id)
+        trace = await conn.fetchrow(_TRACE_SQL, trace_id)
         if not trace:
             raise ValueError(f"Trace {trace_id} not found")
 
-        # Optionally delete existing annotations
-        if overwrite:
-            await conn.execute("DELETE FROM failure_annotations WHERE trace_id = $1", trace_id)
-
         # Get spans
-        span_rows = await conn.fetch(
-            """
-            SELECT
-                span_id, parent_span_id, agent_id, name, kind, status,
-                start_time, end_time, input, output, error_message,
-                attributes, input_tokens, output_tokens, cost_usd
-            FROM spans
-            WHERE trace_id = $1
-            ORDER BY start_time
-            """,
-            trace_id,
-        )
-
-        spans = [dict(row) for row in span_rows]
+        spans = await conn.fetch(_TRACE_SPANS_SQL, trace_id)
 
         # Get agents
-        agent_rows = await conn.fetch(
-            """
-            SELECT DISTINCT a.agent_id, a.name, a.role, a.model, a.framework, a.config
-            FROM agents a
-            JOIN spans s ON s.agent_id = a.agent_id
-            WHERE s.trace_id = $1
-            """,
-            trace_id,
-        )
+        agent_rows = await conn.fetch(_TRACE_AGENTS_SQL, trace_id)
 
-        agents = {row["agent_id"]: dict(row) for row in agent_rows}
+        agents = {row["agent_id"]: row for row in agent_rows}
 
         # Run classification
-        trace_dict = dict(trace)
-        results = classifier.classify(trace_dict, spans, agents)
-
-        # Store results
-        stored_annotations = []
-        for result in results:
-            annotation_id = await conn.fetchval(
-                """
-                INSERT INTO failure_annotations
-                (trace_id, span_id, agent_id, failure_mode, category, confidence, reasoning)
-                VALUES ($1, $2, $3, $4, $5, $6, $7)
-                RETURNING annotation_id
-                """,
-                trace_id,
-                result.span_id,
-                result.agent_id,
-                result.failure_mode,
-                result.category.value,
-                result.confidence,
-                result.reasoning,
-            )
-
-            stored_annotations.append(
-                {
-                    "annotation_id": annotation_id,
-                    "trace_id": trace_id,
-                    "span_id": result.span_id,
-                    "agent_id": result.agent_id,
-                    "failure_mode": result.failure_mode,
-                    "category": result.category.value,
-                    "confidence": result.confidence,
-                    "reasoning": result.reasoning,
-                }
-            )
+        results = classifier.classify(trace, spans, agents)
+
+        # Replace and store annotations in one transaction, so a failed insert
+        # can't leave the trace with its old annotations deleted
+        records = annotation_records(trace_id, results)
+        async with conn.transaction():
+            if overwrite:
+                await conn.execute(_DELETE_ANNOTATIONS_SQL, trace_id)
+            if records:
+                await conn.executemany(_INSERT_ANNOTATION_SQL, records)
+
+        stored_annotations = [
+            {
+                "annotation_id": annotation_id,
+                "trace_id": trace_id,
+                "span_id": result.span_id,
+                "agent_id": result.agent_id,
+                "failure_mode": result.failure_mode,
+                "category": result.category.value,
+                "confidence": result.confidence,
+                "reasoning": result.reasoning,
+            }
+            for (annotation_id, *_), result in zip(records, results, strict=True)
+        ]
 
         logger.info(f"Classified trace {trace_id}: stored {len(stored_annotations)} annotations")
         return stored_annotations
 
 
 async def periodic_classification_job(
-    db: asyncpg.Pool, interval_seconds: int = 300, batch_size: int = 10
+    db: asyncpg.Pool,
+    interval_seconds: int = 300,
+    batch_size: int = 10,
+    workers: int = 4,
+    stop_event: asyncio.Event | None = None,
+    rescan_every: int = 12,
 ) -> None:
     """
     Run classification job periodically in the background.
 
+    Each run classifies the newest unclassified failed traces, so fresh
+    failures are handled promptly however many old traces stay unannotated,
+    plus a catch-up batch that resumes after the newest trace the previous
+    catch-up batch selected, by start time. A trace that was still running
+    when later-started traces were processed is below that mark by the time it
+    fails, so every rescan_every runs the mark is reset and the catch-up walk
+    starts again from the oldest unclassified failed trace.
+
     Args:
         db: Database connection pool
         interval_seconds: Time between job runs
         batch_size: Number of traces to process per run
+        workers: Maximum number of traces written concurrently per run
+        stop_event: When set, the job returns instead of starting another run;
+            setting it also cuts short the wait between runs
+        rescan_every: Number of runs between rescans from the oldest
+            unclassified failed trace; the first run is always a rescan
+
+    Raises:
+        ValueError: If rescan_every is less than 1
     """
+    if rescan_every < 1:
+        raise ValueError(f"rescan_every must be at least 1, got {rescan_every}")
+
     logger.info(f"Starting periodic classification job (interval: {interval_seconds}s)")
 
+    # The classifier holds no per-trace state, so one instance serves every run
+    classifier = RuleBasedClassifier()
+    low_water: tuple[datetime, UUID] = (datetime.min.replace(tzinfo=UTC), UUID(int=0))
+    high_water = low_water
+    runs = 0
+
     while True:
+        if runs % rescan_every == 0:
+            high_water = low_water
+        runs += 1
+
         try:
-            await classify_failed_traces(db, batch_size=batch_size)
+            async with db.acquire() as conn:
+                newest_traces = await conn.fetch(_UNCLASSIFIED_TRACES_SQL, batch_size)
+                catch_up_traces = await conn.fetch(
+                    _UNCLASSIFIED_TRACES_AFTER_SQL, batch_size, *high_water
+                )
+
+            # A trace can be in both batches; dict keys drop the repeat
+            trace_ids = list(
+                dict.fromkeys(row["trace_id"] for row in (*newest_traces, *catch_up_traces))
+            )
+            if trace_ids:
+                traces_classified = await _classify_batch(db, trace_ids, workers, classifier)
+                if catch_up_traces:
+                    last = catch_up_traces[-1]
+                    high_water = (last["start_time"], last["trace_id"])
+                logger.info(
+                    f"Classification run complete: {traces_classified} of "
+                    f"{len(trace_ids)} new failed traces processed"
+                )
         except Exception as e:
             logger.error(f"Error in periodic classification job: {e}", exc_info=True)
 
-        await asyncio.sleep(interval_seconds)
+        if stop_event is None:
+            await asyncio.sleep(interval_seconds)
+            continue
+
+        try:
+            await asyncio.wait_for(stop_event.wait(), timeout=interval_seconds)
+        except TimeoutError:
+            continue
+
+        logger.info("Periodic classification job stopped")
+        return
@@ -2,15 +2,122 @@
 
 from __future__ import annotations
 
+import bisect
+import heapq
 import json
-from dataclasses import dataclass
+import math
+import re
+from collections import Counter, defaultdict, deque
+from collections.abc import Iterator, Mapping, Sequence
+from dataclasses import dataclass, field
 from datetime import datetime
 from typing import Any
 
+import orjson
+
 from .taxonomy import FailureCategory
 
+_DT_MIN = datetime.min
+
+
+def _start_time_key(span: Mapping[str, Any]) -> datetime:
+    """Sort key placing spans without a start time first."""
+    return span.get("start_time") or _DT_MIN
+
+
+_FORMAT_KEYWORDS = (
+    "json",
+    "parse",
+    "schema",
+    "format",
+    "validation",
+    "serialize",
+    "deserialize",
+)
+
+# The lookahead lets findall report overlapping keywords, e.g. "serialize"
+# inside "deserialize", matching what a substring test per keyword finds
+_FORMAT_KEYWORD_RE = re.compile(f"(?=({'|'.join(_FORMAT_KEYWORDS)}))", re.IGNORECASE)
+
+
+# Loop detection looks at each agent's last _LOOP_WINDOW inputs and fires
+# once one fingerprint fills at least _LOOP_SIMILARITY of that window
+_LOOP_WINDOW = 4
+_LOOP_SIMILARITY = 0.9
+_LOOP_MIN_REPEATS = math.ceil(_LOOP_WINDOW * _LOOP_SIMILARITY)
+
+
+@dataclass(slots=True)
+class _InputWindow:
+    """One agent's last few input fingerprints with a running count of each."""
+
+    fingerprints: deque[int] = field(default_factory=lambda: deque(maxlen=_LOOP_WINDOW))
+    counts: Counter[int] = field(default_factory=Counter)
+
+    def push(self, fingerprint: int) -> int:
+        """Slide the window over a new fingerprint and return its count in the window."""
+        if len(self.fingerprints) == _LOOP_WINDOW:
+            oldest = self.fingerprints[0]
+            self.counts[oldest] -= 1
+            if not self.counts[oldest]:
+                del self.counts[oldest]
+        self.fingerprints.append(fingerprint)
+        self.counts[fingerprint] += 1
+        return self.counts[fingerprint]
+
+
+@dataclass(slots=True)
+class _SpanIndex:
+    """Spans of one trace, bucketed in a single pass for the rules.
+
+    Every list keeps start-time order, so rules that only care about error,
+    timeout, handoff or tool spans walk their bucket instead of the whole
+    trace. by_agent holds each agent's timed spans for bisecting by start.
+    """
+
+    spans: list[Mapping[str, Any]]
+    agent_names: dict[Any, str]
+    errors: list[Mapping[str, Any]] = field(default_factory=list)
+    timeouts: list[Mapping[str, Any]] = field(default_factory=list)
+    handoffs: list[tuple[Mapping[str, Any], Any]] = field(default_factory=list)
+    by_agent: dict[Any, list[Mapping[str, Any]]] = field(default_factory=dict)
+    tool_calls: dict[str, list[Mapping[str, Any]]] = field(default_factory=dict)
+
+    @classmethod
+    def build(
+        cls,
+        spans: Sequence[Mapping[str, Any]],
+        agents: Mapping[str, Mapping[str, Any]],
+    ) -> _SpanIndex:
+        """Sort spans by start time and bucket them by status, agent and tool name."""
+        index = cls(
+            spans=sorted(spans, key=_start_time_key),
+            agent_names={
+                agent_id: agent.get("name", agent_id) for agent_id, agent in agents.items()
+            },
+        )
+        for span in index.spans:
+            status = span.get("status")
+            if status == "error":
+                index.errors.append(span)
+            elif status == "timeout":
+                index.timeouts.append(span)
+
+            to_agent = (span.get("attributes") or {}).get("message.to_agent")
+            if to_agent:
+                index.handoffs.append((span, to_agent))
+
+            agent_id = span.get("agent_id")
+            if agent_id and span.get("start_time"):
+                index.by_agent.setdefault(agent_id, []).append(span)
+
+            name = span.get("name") or ""
+            if name and (span.get("kind") == "tool_call" or name.startswith("tool.")):
+                index.tool_calls.setdefault(name, []).append(span)
+        return index
 
-@dataclass
+
+@dataclass(slots=True)
 class ClassificationResult:
     """Result of failure classification for a span or trace."""
 
@@ -40,6 +147,8 @@ class RuleBasedClassifier:
 
     def __init__(self):
         """Initialize classifier."""
+        # Each rule takes (trace, index), where index is the _SpanIndex built
+        # once per classify call, and yields its results
         self.rules = [
             self._check_infinite_loop,
             self._check_handoff_failure,
@@ -50,9 +159,9 @@ class RuleBasedClassifier:
 
     def classify(
         self,
-        trace: dict[str, Any],
-        spans: list[dict[str, Any]],
-        agents: dict[str, dict[str, Any]],
+        trace: Mapping[str, Any],
+        spans: Sequence[Mapping[str, Any]],
+        agents: Mapping[str, Mapping[str, Any]],
     ) -> list[ClassificationResult]:
         """
         Classify failures in a trace.
@@ -65,302 +174,248 @@ class RuleBasedClassifier:
         Returns:
             List of classification results (may be empty if no failures detected)
         """
-        results = []
-
-        # Run all detection rules
-        for rule in self.rules:
-            rule_results = rule(trace, spans, agents)
-            results.extend(rule_results)
+        # Sort and bucket the spans in one pass shared by every rule
+        index = _SpanIndex.build(spans, agents)
 
-        return results
+        return [result for rule in self.rules for result in rule(trace, index)]
 
     def _check_infinite_loop(
         self,
-        trace: dict[str, Any],
-        spans: list[dict[str, Any]],
-        agents: dict[str, dict[str, Any]],
-    ) -> list[ClassificationResult]:
+        trace: Mapping[str, Any],
+        index: _SpanIndex,
+    ) -> Iterator[ClassificationResult]:
         """
         Detect infinite loops: same agent called >3x with similar inputs.
 
         Pattern: Multiple consecutive spans from same agent with similar input content.
         """
-        results = []
-
-        # Group spans by agent
-        agent_spans: dict[str, list[dict]] = {}
-        for span in spans:
+        # Walk all spans once in start order, keeping each agent's last four
+        # normalized inputs; every input is normalized exactly once. Only the
+        # newest fingerprint's count can rise on a slide, so checking that one
+        # count is enough to see the window become similar.
+        windows: defaultdict[str, _InputWindow] = defaultdict(_InputWindow)
+        reported: set[str] = set()
+        agent_names = index.agent_names
+
+        for span in index.spans:
             agent_id = span.get("agent_id")
-            if agent_id:
-                if agent_id not in agent_spans:
-                    agent_spans[agent_id] = []
-                agent_spans[agent_id].append(span)
-
-        # Check each agent for repeated calls with similar inputs
-        for agent_id, agent_span_list in agent_spans.items():
-            # Sort by start time
-            sorted_spans = sorted(
-                agent_span_list, key=lambda s: s.get("start_time") or datetime.min
-            )
-
-            # Look for sequences of similar inputs
-            for i in range(len(sorted_spans) - 3):
-                window = sorted_spans[i : i + 4]
-
-                # Check if inputs are similar (simple heuristic: same keys and similar values)
-                inputs = [self._normalize_input(s.get("input")) for s in window]
-
-                if self._are_inputs_similar(inputs):
-                    # Found potential infinite loop
-                    agent_name = agents.get(agent_id, {}).get("name", agent_id)
-                    results.append(
-                        ClassificationResult(
-                            failure_mode="infinite_loop",
-                            category=FailureCategory.COORDINATION,
-                            confidence=0.85,
-                            reasoning=f"Agent '{agent_name}' executed 4+ times with similar inputs, indicating potential infinite loop",
-                            span_id=window[-1].get("span_id"),
-                            agent_id=agent_id,
-                        )
-                    )
-                    break  # Only report once per agent
+            if not agent_id or agent_id in reported:
+                continue
 
-        return results
+            repeats = windows[agent_id].push(self._normalize_input(span.get("input")))
+
+            if repeats >= _LOOP_MIN_REPEATS:
+                # Found potential infinite loop; only report once per agent
+                reported.add(agent_id)
+                agent_name = agent_names.get(agent_id, agent_id or "unknown")
+                yield ClassificationResult(
+                    failure_mode="infinite_loop",
+                    category=FailureCategory.COORDINATION,
+                    confidence=0.85,
+                    reasoning=f"Agent '{agent_name}' executed 4+ times with similar inputs, indicating potential infinite loop",
+                    span_id=span.get("span_id"),
+                    agent_id=agent_id,
+                )
 
     def _check_handoff_failure(
         self,
-        trace: dict[str, Any],
-        spans: list[dict[str, Any]],
-        agents: dict[str, dict[str, Any]],
-    ) -> list[ClassificationResult]:
+        trace: Mapping[str, Any],
+        index: _SpanIndex,
+    ) -> Iterator[ClassificationResult]:
         """
         Detect handoff failures: agent errors immediately after receiving handoff.
 
-        Pattern: Message from agent A to agent B, followed by error in agent B's next span.
+        Pattern: Message from agent A to agent B, followed by error in the first
+        span agent B starts once the handoff has ended.
         """
-        results = []
-
-        # Sort spans by start time
-        sorted_spans = sorted(spans, key=lambda s: s.get("start_time") or datetime.min)
-
-        # Look for handoff patterns (kind="handoff" or message in attributes)
-        for i in range(len(sorted_spans) - 1):
-            current = sorted_spans[i]
-            next_span = sorted_spans[i + 1]
-
-            # Check if current span is a handoff
-            is_handoff = current.get("kind") == "handoff"
-            attributes = current.get("attributes") or {}
-            to_agent = attributes.get("message.to_agent")
-
-            if is_handoff or to_agent:
-                # Check if next span is from the receiving agent and has error
-                next_agent = next_span.get("agent_id")
-                next_status = next_span.get("status")
-
-                if next_agent == to_agent and next_status == "error":
-                    agent_name = agents.get(next_agent, {}).get("name", next_agent)
-                    results.append(
-                        ClassificationResult(
-                            failure_mode="handoff_failure",
-                            category=FailureCategory.COORDINATION,
-                            confidence=0.9,
-                            reasoning=f"Agent '{agent_name}' failed immediately after receiving handoff",
-                            span_id=next_span.get("span_id"),
-                            agent_id=next_agent,
-                        )
-                    )
+        agent_names = index.agent_names
+        reported: set[int] = set()
+
+        # Handoff spans carry the receiving agent in message.to_agent
+        for current, to_agent in index.handoffs:
+            receiver_spans = index.by_agent.get(to_agent)
+            handed_off_at = current.get("end_time") or current.get("start_time")
+            if not receiver_spans or not handed_off_at:
+                continue
 
-        return results
+            # Receiver's spans are in start order, so bisect for the first one
+            # starting at or after the handoff, regardless of other agents'
+            # spans in between
+            i = bisect.bisect_left(receiver_spans, handed_off_at, key=_start_time_key)
+            if i == len(receiver_spans):
+                continue
+            receiver = receiver_spans[i]
+
+            # Several handoffs can lead to the same receiving span; report it once
+            if receiver.get("status") != "error" or id(receiver) in reported:
+                continue
+            reported.add(id(receiver))
+
+            agent_name = agent_names.get(to_agent, to_agent)
+            yield ClassificationResult(
+                failure_mode="handoff_failure",
+                category=FailureCategory.COORDINATION,
+                confidence=0.9,
+                reasoning=f"Agent '{agent_name}' failed immediately after receiving handoff",
+                span_id=receiver.get("span_id"),
+                agent_id=to_agent,
+            )
 
     def _check_resource_contention(
         self,
-        trace: dict[str, Any],
-        spans: list[dict[str, Any]],
-        agents: dict[str, dict[str, Any]],
-    ) -> list[ClassificationResult]:
+        trace: Mapping[str, Any],
+        index: _SpanIndex,
+    ) -> Iterator[ClassificationResult]:
         """
         Detect resource contention: multiple agents calling same tool simultaneously.
 
         Pattern: Overlapping time windows for tool_call spans with same tool name.
         """
-        results = []
-
-        # Find all tool call spans
-        tool_calls = [
-            span
-            for span in spans
-            if span.get("kind") == "tool_call" or span.get("name", "").startswith("tool.")
-        ]
-
-        # Group by tool name
-        tool_groups: dict[str, list[dict]] = {}
-        for span in tool_calls:
-            tool_name = span.get("name", "")
-            if tool_name:
-                if tool_name not in tool_groups:
-                    tool_groups[tool_name] = []
-                tool_groups[tool_name].append(span)
-
-        # Check for temporal overlap within each tool group
-        for tool_name, tool_span_list in tool_groups.items():
+        agent_names = index.agent_names
+
+        # Check for temporal overlap within each tool group with a sweep:
+        # walk spans by start time, keeping a heap of still-running spans
+        # keyed by end time. Anything that ended before the current span
+        # started can't overlap it or any later span, so it is dropped.
+        # Times are converted to epoch floats once per span, so the heap and
+        # the overlap test compare floats rather than datetimes.
+        for tool_name, tool_span_list in index.tool_calls.items():
             if len(tool_span_list) < 2:
                 continue
 
-            # Check each pair for overlap
-            for i in range(len(tool_span_list)):
-                for j in range(i + 1, len(tool_span_list)):
-                    span1 = tool_span_list[i]
-                    span2 = tool_span_list[j]
-
-                    if self._spans_overlap(span1, span2):
-                        agent1_id = span1.get("agent_id")
-                        agent2_id = span2.get("agent_id")
-
-                        # Different agents accessing same resource
-                        if agent1_id != agent2_id:
-                            agent1_name = agents.get(agent1_id, {}).get("name", agent1_id)
-                            agent2_name = agents.get(agent2_id, {}).get("name", agent2_id)
-
-                            results.append(
-                                ClassificationResult(
-                                    failure_mode="resource_contention",
-                                    category=FailureCategory.COORDINATION,
-                                    confidence=0.75,
-                                    reasoning=f"Agents '{agent1_name}' and '{agent2_name}' simultaneously accessed tool '{tool_name}'",
-                                    span_id=span2.get("span_id"),
-                                    agent_id=agent2_id,
-                                )
-                            )
-
-        return results
+            timed_spans = [
+                (span["start_time"].timestamp(), span["end_time"].timestamp(), span)
+                for span in tool_span_list
+                if span.get("start_time") and span.get("end_time")
+            ]
+            active: list[tuple[float, float, int, Mapping[str, Any]]] = []
+            reported: set[tuple[Any, Any]] = set()
+
+            for seq, (start2, end2, span2) in enumerate(timed_spans):
+                while active and active[0][0] <= start2:
+                    heapq.heappop(active)
+
+                agent2_id = span2.get("agent_id")
+                for end1, start1, _, span1 in active:
+                    agent1_id = span1.get("agent_id")
+
+                    # Different agents accessing same resource, reported once per pair
+                    if agent1_id == agent2_id or (agent1_id, agent2_id) in reported:
+                        continue
+                    # Spans overlap if one starts before the other ends
+                    if not (start1 < end2 and start2 < end1):
+                        continue
+
+                    reported.add((agent1_id, agent2_id))
+                    agent1_name = agent_names.get(agent1_id, agent1_id or "unknown")
+                    agent2_name = agent_names.get(agent2_id, agent2_id or "unknown")
+
+                    yield ClassificationResult(
+                        failure_mode="resource_contention",
+                        category=FailureCategory.COORDINATION,
+                        confidence=0.75,
+                        reasoning=f"Agents '{agent1_name}' and '{agent2_name}' simultaneously accessed tool '{tool_name}'",
+                        span_id=span2.get("span_id"),
+                        agent_id=agent2_id,
+                    )
+
+                heapq.heappush(active, (end2, start2, seq, span2))
 
     def _check_format_error(
         self,
-        trace: dict[str, Any],
-        spans: list[dict[str, Any]],
-        agents: dict[str, dict[str, Any]],
-    ) -> list[ClassificationResult]:
+        trace: Mapping[str, Any],
+        index: _SpanIndex,
+    ) -> Iterator[ClassificationResult]:
         """
         Detect message format errors: error messages containing format-related keywords.
 
         Pattern: Error status with message containing "json", "parse", "schema", "format", "validation".
         """
-        results = []
-
-        format_keywords = [
-            "json",
-            "parse",
-            "schema",
-            "format",
-            "validation",
-            "serialize",
-            "deserialize",
-        ]
-
-        for span in spans:
-            if span.get("status") != "error":
-                continue
-
-            # Check error message
-            error_msg = span.get("error_message", "").lower()
-            output = span.get("output") or {}
-            if isinstance(output, dict):
-                output_str = json.dumps(output).lower()
-            else:
-                output_str = str(output).lower()
-
-            # Look for format-related keywords
-            found_keywords = []
-            for keyword in format_keywords:
-                if keyword in error_msg or keyword in output_str:
-                    found_keywords.append(keyword)
+        agent_names = index.agent_names
+
+        for span in index.errors:
+            # Check error message first; output is only serialized and scanned
+            # when the message itself names no format keyword. Numbers and
+            # bools render as digits or True/False, which never contain one.
+            matches = {
+                match.lower()
+                for match in _FORMAT_KEYWORD_RE.findall(span.get("error_message") or "")
+            }
+            output = span.get("output")
+            if not matches and output and not isinstance(output, int | float):
+                output_str = json.dumps(output) if isinstance(output, dict) else str(output)
+                matches = {match.lower() for match in _FORMAT_KEYWORD_RE.findall(output_str)}
+
+            found_keywords = [keyword for keyword in _FORMAT_KEYWORDS if keyword in matches]
 
             if found_keywords:
                 agent_id = span.get("agent_id")
-                agent_name = agents.get(agent_id, {}).get("name", agent_id or "unknown")
-
-                results.append(
-                    ClassificationResult(
-                        failure_mode="message_format_error",
-                        category=FailureCategory.COORDINATION,
-                        confidence=0.8,
-                        reasoning=f"Agent '{agent_name}' encountered format error (keywords: {', '.join(found_keywords)})",
-                        span_id=span.get("span_id"),
-                        agent_id=agent_id,
-                    )
+                agent_name = agent_names.get(agent_id, agent_id or "unknown")
+
+                yield ClassificationResult(
+                    failure_mode="message_format_error",
+                    category=FailureCategory.COORDINATION,
+                    confidence=0.8,
+                    reasoning=f"Agent '{agent_name}' encountered format error (keywords: {', '.join(found_keywords)})",
+                    span_id=span.get("span_id"),
+                    agent_id=agent_id,
                 )
 
-        return results
-
     def _check_timeout_pattern(
         self,
-        trace: dict[str, Any],
-        spans: list[dict[str, Any]],
-        agents: dict[str, dict[str, Any]],
-    ) -> list[ClassificationResult]:
+        trace: Mapping[str, Any],
+        index: _SpanIndex,
+    ) -> Iterator[ClassificationResult]:
         """
         Detect timeout failures: spans with status="timeout".
 
         Pattern: Status field explicitly set to timeout.
         """
-        results = []
-
-        for span in spans:
-            if span.get("status") == "timeout":
-                agent_id = span.get("agent_id")
-                agent_name = agents.get(agent_id, {}).get("name", agent_id or "unknown")
-
-                # Calculate span duration
-                start = span.get("start_time")
-                end = span.get("end_time")
-                duration_ms = 0.0
-                if start and end:
-                    duration_ms = (end - start).total_seconds() * 1000
-
-                results.append(
-                    ClassificationResult(
-                        failure_mode="timeout",
-                        category=FailureCategory.VERIFICATION,
-                        confidence=0.95,
-                        reasoning=f"Agent '{agent_name}' execution timed out after {duration_ms:.0f}ms",
-                        span_id=span.get("span_id"),
-                        agent_id=agent_id,
-                    )
-                )
+        agent_names = index.agent_names
 
-        return results
+        for span in index.timeouts:
+            agent_id = span.get("agent_id")
+            agent_name = agent_names.get(agent_id, agent_id or "unknown")
+
+            # Calculate span duration
+            start = span.get("start_time")
+            end = span.get("end_time")
+            duration_ms = 0.0
+            if start and end:
+                duration_ms = (end - start).total_seconds() * 1000
+
+            yield ClassificationResult(
+                failure_mode="timeout",
+                category=FailureCategory.VERIFICATION,
+                confidence=0.95,
+                reasoning=f"Agent '{agent_name}' execution timed out after {duration_ms:.0f}ms",
+                span_id=span.get("span_id"),
+                agent_id=agent_id,
+            )
 
     # Helper methods
 
-    def _normalize_input(self, input_data: Any) -> str:
-        """Normalize input for comparison."""
+    def _normalize_input(self, input_data: Any) -> int:
+        """
+        Reduce input to a fingerprint for equality comparison.
+
+        Dicts are hashed over key-sorted orjson bytes, so equal inputs match
+        regardless of key order. orjson rejects some values (e.g. ints wider
+        than 64 bits), so those dicts fall back to key-sorted stdlib json.
+        Fingerprints are only compared within one classify call, so the
+        per-process hash seed doesn't matter.
+        """
         if input_data is None:
-            return ""
+            return hash("")
         if isinstance(input_data, dict):
-            return json.dumps(input_data, sort_keys=True)
-        return str(input_data)
-
-    def _are_inputs_similar(self, inputs: list[str], threshold: float = 0.9) -> bool:
-        """Check if inputs are similar (simple string comparison)."""
-        if not inputs or len(inputs) < 2:
-            return False
-
-        # Simple heuristic: check if all inputs are identical or very similar
-        first = inputs[0]
-        similar_count = sum(1 for inp in inputs if inp == first)
-
-        return similar_count >= len(inputs) * threshold
-
-    def _spans_overlap(self, span1: dict, span2: dict) -> bool:
-        """Check if two spans have overlapping time windows."""
-        start1 = span1.get("start_time")
-        end1 = span1.get("end_time")
-        start2 = span2.get("start_time")
-        end2 = span2.get("end_time")
-
-        if not all([start1, end1, start2, end2]):
-            return False
-
-        # Spans overlap if one starts before the other ends
-        return start1 < end2 and start2 < end1
+            try:
+                return hash(
+                    orjson.dumps(
+                        input_data,
+                        default=str,
+                        option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS,
+                    )
+                )
+            except orjson.JSONEncodeError:
+                return hash(json.dumps(input_data, sort_keys=True, default=str))
+        return hash(str(input_data))
@@ -2,13 +2,15 @@
 
 from __future__ import annotations
 
+import sys
 from dataclasses import dataclass, field
 from typing import Any
+from uuid import UUID
 
 import asyncpg
 
 
-@dataclass
+@dataclass(slots=True)
 class TraceMetrics:
     """Aggregated metrics for a trace."""
 
@@ -45,7 +47,71 @@ class TraceMetrics:
         }
 
 
-async def compute_trace_metrics(trace_id: str, db: asyncpg.Pool) -> TraceMetrics:
+_TRACE_METRICS_COLUMNS = """
+    GROUPING(s.agent_id) = 1 as is_total,
+    s.agent_id,
+    a.name as agent_name,
+    COUNT(DISTINCT s.agent_id) as agent_count,
+    COUNT(*) as span_count,
+    COALESCE(SUM(s.input_tokens + s.output_tokens), 0) as total_tokens,
+    COALESCE(SUM(s.cost_usd), 0.0) as total_cost_usd,
+    COALESCE(SUM(CASE WHEN s.status = 'error' THEN 1 ELSE 0 END), 0) as error_count,
+    COALESCE(AVG(EXTRACT(EPOCH FROM (s.end_time - s.start_time)) * 1000), 0.0)
+        as avg_latency_ms,
+    MIN(s.start_time) as trace_start,
+    MAX(s.end_time) as trace_end
+"""
+
+# Trace totals and per-agent breakdowns in one scan: the empty grouping set is
+# the trace-level row (always present, even with no spans), flagged by
+# GROUPING() so it isn't confused with NULL-agent spans
+_TRACE_METRICS_SQL = f"""
+    SELECT {_TRACE_METRICS_COLUMNS}
+    FROM spans s
+    LEFT JOIN agents a ON s.agent_id = a.agent_id
+    WHERE s.trace_id = $1
+    GROUP BY GROUPING SETS ((), (s.agent_id, a.name))
+"""
+
+# Same shape across many traces; each trace's total row groups by trace_id
+# alone. Traces with no spans produce no rows.
+_TRACE_METRICS_BATCH_SQL = f"""
+    SELECT s.trace_id, {_TRACE_METRICS_COLUMNS}
+    FROM spans s
+    LEFT JOIN agents a ON s.agent_id = a.agent_id
+    WHERE s.trace_id = ANY($1)
+    GROUP BY GROUPING SETS ((s.trace_id), (s.trace_id, s.agent_id, a.name))
+"""
+
+
+def _apply_metrics_row(metrics: TraceMetrics, row: asyncpg.Record) -> None:
+    """Fold one trace-total or per-agent row into metrics."""
+    if row["is_total"]:
+        metrics.agent_count = row["agent_count"] or 0
+        metrics.span_count = row["span_count"] or 0
+        metrics.total_tokens = row["total_tokens"] or 0
+        metrics.total_cost_usd = row["total_cost_usd"] or 0.0
+        metrics.error_count = row["error_count"] or 0
+
+        # Calculate total duration
+        if row["trace_start"] and row["trace_end"]:
+            duration = row["trace_end"] - row["trace_start"]
+            metrics.total_duration_ms = duration.total_seconds() * 1000
+        return
+
+    agent_id = row["agent_id"]
+    if agent_id is None:
+        return
+    # The same few agent names key every snapshot's three breakdown
+    # dicts, so share one string object per name
+    agent_name = sys.intern(row["agent_name"]) if row["agent_name"] else agent_id
+
+    metrics.tokens_by_agent[agent_name] = row["total_tokens"]
+    metrics.cost_by_agent[agent_name] = row["total_cost_usd"]
+    metrics.latency_by_agent[agent_name] = float(row["avg_latency_ms"])
+
+
+async def compute_trace_metrics(trace_id: UUID | str, db: asyncpg.Pool) -> TraceMetrics:
     """
     Compute aggregated metrics for a trace from the database.
 
@@ -56,66 +122,62 @@ async def compute_trace_metrics(trace_id: str, db: asyncpg.Pool) -> TraceMetrics
     Returns:
         TraceMetrics with all fields populated
     """
-    metrics = TraceMetrics(trace_id=trace_id)
+    metrics = TraceMetrics(trace_id=str(trace_id))
 
     async with db.acquire() as conn:
-        # Get overall trace-level metrics
-        trace_data = await conn.fetchrow(
-            """
-            SELECT
-                COUNT(DISTINCT agent_id) as agent_count,
-                COUNT(*) as span_count,
-                COALESCE(SUM(input_tokens + output_tokens), 0) as total_tokens,
-                COALESCE(SUM(cost_usd), 0.0) as total_cost_usd,
-                COALESCE(SUM(CASE WHEN status = 'error' THEN 1 ELSE 0 END), 0) as error_count,
-                MIN(start_time) as trace_start,
-                MAX(end_time) as trace_end
-            FROM spans
-            WHERE trace_id = $1
-            """,
-            trace_id,
-        )
-
-        if trace_data:
-            metrics.agent_count = trace_data["agent_count"] or 0
-            metrics.span_count = trace_data["span_count"] or 0
-            metrics.total_tokens = trace_data["total_tokens"] or 0
-            metrics.total_cost_usd = float(trace_data["total_cost_usd"] or 0.0)
-            metrics.error_count = trace_data["error_count"] or 0
-
-            # Calculate total duration
-            if trace_data["trace_start"] and trace_data["trace_end"]:
-                duration = trace_data["trace_end"] - trace_data["trace_start"]
-                metrics.total_duration_ms = duration.total_seconds() * 1000
-
-        # Get per-agent breakdowns
-        agent_metrics = await conn.fetch(
-            """
-            SELECT
-                s.agent_id,
-                a.name as agent_name,
-                COALESCE(SUM(s.input_tokens + s.output_tokens), 0) as total_tokens,
-                COALESCE(SUM(s.cost_usd), 0.0) as total_cost,
-                COALESCE(AVG(EXTRACT(EPOCH FROM (s.end_time - s.start_time)) * 1000), 0.0) as avg_latency_ms
-            FROM spans s
-            LEFT JOIN agents a ON s.agent_id = a.agent_id
-            WHERE s.trace_id = $1 AND s.agent_id IS NOT NULL
-            GROUP BY s.agent_id, a.name
-            """,
-            trace_id,
-        )
-
-        for row in agent_metrics:
-            agent_id = row["agent_id"]
-            agent_name = row["agent_name"] or agent_id
-
-            metrics.tokens_by_agent[agent_name] = row["total_tokens"]
-            metrics.cost_by_agent[agent_name] = float(row["total_cost"])
-            metrics.latency_by_agent[agent_name] = float(row["avg_latency_ms"])
+        rows = await conn.fetch(_TRACE_METRICS_SQL, trace_id)
+
+    for row in rows:
+        _apply_metrics_row(metrics, row)
 
     return metrics
 
 
+async def compute_trace_metrics_batch(
+    trace_ids: list[str], db: asyncpg.Pool
+) -> dict[str, TraceMetrics]:
+    """
+    Compute aggregated metrics for many traces in one query.
+
+    Args:
+        trace_ids: Trace IDs to compute metrics for
+        db: Database connection pool
+
+    Returns:
+        Mapping of trace ID (as a string) to its TraceMetrics. Every requested
+        trace is present; traces without spans have zeroed metrics.
+    """
+    results = {str(trace_id): TraceMetrics(trace_id=trace_id) for trace_id in trace_ids}
+    if not results:
+        return results
+
+    async with db.acquire() as conn:
+        rows = await conn.fetch(_TRACE_METRICS_BATCH_SQL, list(trace_ids))
+
+    for row in rows:
+        metrics = results.get(str(row["trace_id"]))
+        if metrics is not None:
+            _apply_metrics_row(metrics, row)
+
+    return results
+
+
+_AGENT_METRICS_COLUMNS = """
+    COUNT(*) as span_count,
+    COALESCE(SUM(input_tokens + output_tokens), 0) as total_tokens,
+    COALESCE(SUM(cost_usd), 0.0) as total_cost_usd,
+    COALESCE(AVG(EXTRACT(EPOCH FROM (end_time - start_time)) * 1000), 0.0) as avg_latency_ms,
+    COALESCE(SUM(CASE WHEN status = 'error' THEN 1 ELSE 0 END), 0) as error_count
+"""
+
+# Fixed texts for the scoped and unscoped variants, so each hits asyncpg's
+# per-connection statement cache instead of being rebuilt per call
+_AGENT_METRICS_SQL = f"SELECT {_AGENT_METRICS_COLUMNS} FROM spans WHERE agent_id = $1"
+_AGENT_TRACE_METRICS_SQL = (
+    f"SELECT {_AGENT_METRICS_COLUMNS} FROM spans WHERE agent_id = $1 AND trace_id = $2"
+)
+
+
 async def compute_agent_metrics(
     agent_id: str, trace_id: str | None, db: asyncpg.Pool
 ) -> dict[str, Any]:
@@ -131,29 +193,16 @@ async def compute_agent_metrics(
         Dictionary with agent metrics
     """
     async with db.acquire() as conn:
-        query = """
-            SELECT
-                COUNT(*) as span_count,
-                COALESCE(SUM(input_tokens + output_tokens), 0) as total_tokens,
-                COALESCE(SUM(cost_usd), 0.0) as total_cost_usd,
-                COALESCE(AVG(EXTRACT(EPOCH FROM (end_time - start_time)) * 1000), 0.0) as avg_latency_ms,
-                COALESCE(SUM(CASE WHEN status = 'error' THEN 1 ELSE 0 END), 0) as error_count
-            FROM spans
-            WHERE agent_id = $1
-        """
-
-        params = [agent_id]
         if trace_id:
-            query += " AND trace_id = $2"
-            params.append(trace_id)
-
-        data = await conn.fetchrow(query, *params)
+            data = await conn.fetchrow(_AGENT_TRACE_METRICS_SQL, agent_id, trace_id)
+        else:
+            data = await conn.fetchrow(_AGENT_METRICS_SQL, agent_id)
 
         return {
             "agent_id": agent_id,
             "span_count": data["span_count"] or 0,
             "total_tokens": data["total_tokens"] or 0,
-            "total_cost_usd": float(data["total_cost_usd"] or 0.0),
+            "total_cost_usd": data["total_cost_usd"] or 0.0,
             "avg_latency_ms": float(data["avg_latency_ms"] or 0.0),
             "error_count": data["error_count"] or 0,
         }
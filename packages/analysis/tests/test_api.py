@@ -1,13 +1,67 @@
 """Tests for analysis API endpoints."""
 
 from datetime import UTC, datetime
+from types import MappingProxyType
 from unittest.mock import AsyncMock, MagicMock
 
 import pytest
+from fastapi import FastAPI
 from fastapi.testclient import TestClient
+from pydantic import ValidationError
 
 from agenttrace_analysis import api
 
+TRACE_ID = "5f0c6a3e-8d2b-4f6e-9a1c-3b7d2e4f6a80"
+SPAN_ID = "0c9b1e7a-2f4d-4a6b-8e3c-5d7f9a1b3c2e"
+MISSING_ID = "00000000-0000-4000-8000-000000000000"
+FIXED_NOW = datetime(2026, 1, 1, tzinfo=UTC)
+
+# Read-only trace row shared by the trace tests; tests that need changes
+# build a dict from it with their overrides
+_SAMPLE_TRACE = MappingProxyType(
+    {
+        "trace_id": TRACE_ID,
+        "name": "Test Trace",
+        "status": "completed",
+        "start_time": FIXED_NOW,
+        "end_time": FIXED_NOW,
+        "metadata": {},
+        "total_tokens": 1500,
+        "total_cost_usd": 0.08,
+        "agent_count": 3,
+        "span_count": 10,
+    }
+)
+
+_SAMPLE_SPAN = MappingProxyType(
+    {
+        "span_id": "span-1",
+        "trace_id": TRACE_ID,
+        "parent_span_id": None,
+        "agent_id": "agent-1",
+        "agent_name": "TestAgent",
+        "agent_role": "coordinator",
+        "name": "agent_execution",
+        "kind": "agent",
+        "status": "ok",
+        "start_time": datetime(2026, 1, 31, 12, 0, 0, tzinfo=UTC),
+        "end_time": datetime(2026, 1, 31, 12, 0, 5, tzinfo=UTC),
+        "model": "gpt-4",
+        "input": {"query": "test"},
+        "output": {"result": "success"},
+        "error": None,
+        "attributes": {},
+        "input_tokens": 100,
+        "output_tokens": 50,
+        "cost_usd": 0.01,
+    }
+)
+
+
+def _plan(rows):
+    """Build an EXPLAIN (FORMAT JSON) result with the given row estimate."""
+    return f'[{{"Plan": {{"Plan Rows": {rows}}}}}]'
+
 
 @pytest.fixture
 def mock_db_pool():
@@ -24,24 +78,32 @@ def mock_db_pool():
     return pool, conn
 
 
+@pytest.fixture(scope="module")
+def app_client():
+    """Create one test client over the API router for the whole module."""
+    app = FastAPI()
+    app.include_router(api.router)
+
+    with TestClient(app) as client:
+        yield client
+
+
 @pytest.fixture
-def client(mock_db_pool):
-    """Create test client with mock database."""
+def client(app_client, mock_db_pool):
+    """Point the shared test client at this test's mock database."""
     pool, _ = mock_db_pool
-    api.set_db_pool(pool)
-
-    from fastapi import FastAPI
+    overrides = app_client.app.dependency_overrides
+    overrides[api.get_db] = lambda: pool
 
-    app = FastAPI()
-    app.include_router(api.router)
+    yield app_client
 
-    return TestClient(app)
+    overrides.clear()
 
 
 def test_list_traces_empty(client, mock_db_pool):
     """Test listing traces when database is empty."""
     pool, conn = mock_db_pool
-    conn.fetchval.return_value = 0  # Total count
+    conn.fetchval.return_value = _plan(0)  # Planner estimate
     conn.fetch.return_value = []  # Empty results
 
     response = client.get("/api/traces")
@@ -57,33 +119,18 @@ def test_list_traces_empty(client, mock_db_pool):
 def test_list_traces_with_results(client, mock_db_pool):
     """Test listing traces with results."""
     pool, conn = mock_db_pool
-    conn.fetchval.return_value = 2  # Total count
+    conn.fetchval.return_value = _plan(2)
 
     # Mock trace results
     mock_traces = [
+        {**_SAMPLE_TRACE, "name": "Test Trace 1", "metadata": {"key": "value"}, "_total": 2},
         {
-            "trace_id": "trace-1",
-            "name": "Test Trace 1",
-            "status": "completed",
-            "start_time": datetime.now(UTC),
-            "end_time": datetime.now(UTC),
-            "metadata": {"key": "value"},
-            "total_tokens": 1000,
-            "total_cost_usd": 0.05,
-            "agent_count": 3,
-            "span_count": 10,
-        },
-        {
+            **_SAMPLE_TRACE,
             "trace_id": "trace-2",
             "name": "Test Trace 2",
             "status": "failed",
-            "start_time": datetime.now(UTC),
             "end_time": None,
-            "metadata": {},
-            "total_tokens": 500,
-            "total_cost_usd": 0.02,
-            "agent_count": 2,
-            "span_count": 5,
+            "_total": 2,
         },
     ]
     conn.fetch.return_value = mock_traces
@@ -95,25 +142,49 @@ def test_list_traces_with_results(client, mock_db_pool):
     assert len(data["traces"]) == 2
     assert data["total"] == 2
     assert data["limit"] == 10
+    assert data["total_exact"] is True
+    assert "COUNT(*) OVER ()" in conn.fetch.call_args.args[0]
+
+
+def test_list_traces_estimated_total(client, mock_db_pool):
+    """Test that large result sets report the planner estimate instead of counting."""
+    pool, conn = mock_db_pool
+    conn.fetchval.return_value = _plan(250_000)
+    conn.fetch.return_value = []
+
+    response = client.get("/api/traces")
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total"] == 250_000
+    assert data["total_exact"] is False
+    assert "EXPLAIN" in conn.fetchval.call_args.args[0]
+    assert "COUNT(*) OVER ()" not in conn.fetch.call_args.args[0]
+
+    response = client.get("/api/traces?exact_total=true")
+
+    assert response.json()["total_exact"] is True
+    assert "COUNT(*) OVER ()" in conn.fetch.call_args.args[0]
+
+
+def test_list_traces_offset_past_end(client, mock_db_pool):
+    """Test that the total is still reported when the page is empty."""
+    pool, conn = mock_db_pool
+    conn.fetchval.side_effect = [_plan(3), 3]  # estimate, exact count
+    conn.fetch.return_value = []
+
+    response = client.get("/api/traces?offset=100")
+
+    assert response.status_code == 200
+    assert response.json()["total"] == 3
 
 
 def test_list_traces_with_status_filter(client, mock_db_pool):
     """Test listing traces filtered by status."""
     pool, conn = mock_db_pool
-    conn.fetchval.return_value = 1
+    conn.fetchval.return_value = _plan(1)
     conn.fetch.return_value = [
-        {
-            "trace_id": "trace-1",
-            "name": "Failed Trace",
-            "status": "failed",
-            "start_time": datetime.now(UTC),
-            "end_time": datetime.now(UTC),
-            "metadata": {},
-            "total_tokens": 200,
-            "total_cost_usd": 0.01,
-            "agent_count": 1,
-            "span_count": 3,
-        }
+        {**_SAMPLE_TRACE, "name": "Failed Trace", "status": "failed", "_total": 1}
     ]
 
     response = client.get("/api/traces?status=failed")
@@ -124,12 +195,88 @@ def test_list_traces_with_status_filter(client, mock_db_pool):
     assert data["traces"][0]["status"] == "failed"
 
 
+def test_list_traces_with_metadata_filter(client, mock_db_pool):
+    """Test that metadata filters are emitted as JSONB containment."""
+    pool, conn = mock_db_pool
+    conn.fetchval.return_value = _plan(0)
+    conn.fetch.return_value = []
+
+    response = client.get('/api/traces?metadata={"env": "prod"}')
+
+    assert response.status_code == 200
+    query, *params = conn.fetch.call_args.args
+    assert "metadata @> $1::text::jsonb" in query
+    assert params[0] == '{"env":"prod"}'
+
+
+def test_list_traces_invalid_metadata_filter(client, mock_db_pool):
+    """Test that non-object metadata filters are rejected."""
+    response = client.get("/api/traces?metadata=not-json")
+    assert response.status_code == 400
+
+    response = client.get("/api/traces?metadata=[1, 2]")
+    assert response.status_code == 400
+
+
+def test_list_traces_cursor_pagination(client, mock_db_pool):
+    """Test walking trace pages with a keyset cursor."""
+    pool, conn = mock_db_pool
+    conn.fetchval.return_value = _plan(5)
+    conn.fetch.return_value = [
+        {
+            **_SAMPLE_TRACE,
+            "start_time": datetime(2026, 1, 31, 12, 0, 0, tzinfo=UTC),
+            "end_time": None,
+            "_total": 5,
+        }
+    ]
+
+    response = client.get("/api/traces?limit=1")
+
+    assert response.status_code == 200
+    next_cursor = response.json()["next_cursor"]
+    assert next_cursor is not None
+
+    conn.fetchval.reset_mock()
+    response = client.get(f"/api/traces?limit=1&cursor={next_cursor}")
+
+    assert response.status_code == 200
+    assert response.json()["total"] is None
+    conn.fetchval.assert_not_called()
+    query, *params = conn.fetch.call_args.args
+    assert "(t.start_time, t.trace_id) < ($1, $2)" in query
+    assert "OFFSET" not in query
+    assert params == [datetime(2026, 1, 31, 12, 0, 0, tzinfo=UTC), TRACE_ID, 1]
+
+
+def test_list_traces_invalid_cursor(client, mock_db_pool):
+    """Test that malformed cursors are rejected."""
+    response = client.get("/api/traces?cursor=not-a-cursor")
+
+    assert response.status_code == 400
+
+
+def test_listings_reject_cursor_with_offset(client, mock_db_pool):
+    """Test that a cursor and a non-zero offset can't be combined."""
+    pool, conn = mock_db_pool
+    cursor = api._encode_cursor(datetime(2026, 1, 31, 12, 0, 0, tzinfo=UTC), TRACE_ID)
+
+    response = client.get(f"/api/traces?cursor={cursor}&offset=10")
+    assert response.status_code == 422
+
+    response = client.get(f"/api/traces/{TRACE_ID}/spans?cursor={cursor}&offset=10")
+    assert response.status_code == 422
+
+    conn.fetch.assert_not_called()
+    conn.fetchval.assert_not_called()
+
+
 def test_get_trace_not_found(client, mock_db_pool):
     """Test getting a trace that doesn't exist."""
     pool, conn = mock_db_pool
     conn.fetchrow.return_value = None
 
-    response = client.get("/api/traces/nonexistent")
+    response = client.get(f"/api/traces/{MISSING_ID}")
 
     assert response.status_code == 404
     assert "not found" in response.json()["detail"].lower()
@@ -140,28 +287,27 @@ def test_get_trace_success(client, mock_db_pool):
     pool, conn = mock_db_pool
 
     # Mock trace data
-    conn.fetchrow.side_effect = [
-        {
-            "trace_id": "trace-1",
-            "name": "Test Trace",
-            "status": "completed",
-            "start_time": datetime.now(UTC),
-            "end_time": datetime.now(UTC),
-            "metadata": {},
-            "total_tokens": 1500,
-            "total_cost_usd": 0.08,
-            "agent_count": 3,
-        },
-        {"span_count": 10, "agent_count": 3},
-    ]
+    conn.fetchrow.return_value = _SAMPLE_TRACE
 
-    response = client.get("/api/traces/trace-1")
+    response = client.get(f"/api/traces/{TRACE_ID}")
 
     assert response.status_code == 200
     data = response.json()
-    assert data["trace_id"] == "trace-1"
+    assert data["trace_id"] == TRACE_ID
     assert data["span_count"] == 10
     assert data["agent_count"] == 3
+    # Counts come from the trace row, not a second aggregate over spans
+    assert conn.fetchrow.await_count == 1
+
+
+def test_get_trace_invalid_id(client, mock_db_pool):
+    """Test that malformed trace IDs are rejected before reaching the database."""
+    pool, conn = mock_db_pool
+
+    response = client.get("/api/traces/not-a-uuid")
+
+    assert response.status_code == 422
+    conn.fetchrow.assert_not_called()
 
 
 def test_get_trace_graph_not_found(client, mock_db_pool):
@@ -169,7 +315,7 @@ def test_get_trace_graph_not_found(client, mock_db_pool):
     pool, conn = mock_db_pool
     conn.fetchval.return_value = False  # Trace doesn't exist
 
-    response = client.get("/api/traces/nonexistent/graph")
+    response = client.get(f"/api/traces/{MISSING_ID}/graph")
 
     assert response.status_code == 404
 
@@ -191,16 +337,16 @@ def test_get_trace_failures(client, mock_db_pool):
             "category": "verification",
             "confidence": 0.95,
             "reasoning": "Timeout occurred",
-            "created_at": datetime.now(UTC),
+            "created_at": FIXED_NOW,
         }
     ]
     conn.fetch.return_value = mock_annotations
 
-    response = client.get("/api/traces/trace-1/failures")
+    response = client.get(f"/api/traces/{TRACE_ID}/failures")
 
     assert response.status_code == 200
     data = response.json()
-    assert data["trace_id"] == "trace-1"
+    assert data["trace_id"] == TRACE_ID
     assert data["count"] == 1
     assert len(data["annotations"]) == 1
     assert data["annotations"][0]["failure_mode"] == "timeout"
@@ -211,47 +357,100 @@ def test_get_trace_metrics_not_found(client, mock_db_pool):
     pool, conn = mock_db_pool
     conn.fetchval.return_value = False  # Trace doesn't exist
 
-    response = client.get("/api/traces/nonexistent/metrics")
+    response = client.get(f"/api/traces/{MISSING_ID}/metrics")
 
     assert response.status_code == 404
 
 
+def _span_cursor(rows):
+    """Mock asyncpg's server-side cursor over the given rows."""
+
+    async def iterate():
+        for row in rows:
+            yield row
+
+    return MagicMock(return_value=iterate())
+
+
 def test_list_trace_spans(client, mock_db_pool):
     """Test listing spans for a trace."""
     pool, conn = mock_db_pool
 
-    # Mock trace existence and spans
-    conn.fetchval.side_effect = [True, 5]  # exists, total count
-    mock_spans = [
+    # Mock the trace's span count and the Postgres-rendered span rows
+    conn.fetchval.return_value = 5
+    conn.transaction = MagicMock(return_value=AsyncMock())
+    conn.cursor = _span_cursor(
+        [
+            {
+                "span": f'{{"span_id": "{SPAN_ID}", "input": {{"q": "hi"}}}}',
+                "start_time": datetime(2026, 1, 31, 12, 0, 0, tzinfo=UTC),
+                "span_id": SPAN_ID,
+            }
+        ]
+    )
+
+    response = client.get(f"/api/traces/{TRACE_ID}/spans")
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["trace_id"] == TRACE_ID
+    assert data["total"] == 5
+    assert len(data["spans"]) == 1
+    assert data["spans"][0]["input"] == {"q": "hi"}
+    assert data["next_cursor"] is None
+
+
+def test_list_trace_spans_cursor(client, mock_db_pool):
+    """Test that span cursors seek past the previous page."""
+    pool, conn = mock_db_pool
+    conn.fetchval.return_value = 5
+    conn.transaction = MagicMock(return_value=AsyncMock())
+    rows = [
         {
-            "span_id": "span-1",
-            "trace_id": "trace-1",
-            "parent_span_id": None,
-            "agent_id": "agent-1",
-            "name": "agent_execution",
-            "kind": "agent",
-            "status": "ok",
-            "start_time": datetime.now(UTC),
-            "end_time": datetime.now(UTC),
-            "model": "gpt-4",
-            "input": {},
-            "output": {},
-            "error": None,
-            "attributes": {},
-            "input_tokens": 100,
-            "output_tokens": 50,
-            "cost_usd": 0.01,
+            "span": f'{{"span_id": "span-{i}"}}',
+            "start_time": datetime(2026, 1, 31, 12, 0, i, tzinfo=UTC),
+            "span_id": f"span-{i}",
         }
+        for i in range(2)
     ]
-    conn.fetch.return_value = mock_spans
+    conn.cursor = _span_cursor(rows)
+    cursor = api._encode_cursor(datetime(2026, 1, 31, 12, 0, 0, tzinfo=UTC), SPAN_ID)
 
-    response = client.get("/api/traces/trace-1/spans")
+    response = client.get(f"/api/traces/{TRACE_ID}/spans?limit=2&cursor={cursor}")
 
     assert response.status_code == 200
     data = response.json()
-    assert data["trace_id"] == "trace-1"
-    assert data["total"] == 5
-    assert len(data["spans"]) == 1
+    assert [span["span_id"] for span in data["spans"]] == ["span-0", "span-1"]
+    assert data["total"] is None
+    assert api._decode_cursor(data["next_cursor"])[1] == "span-1"
+    # Only the trace row lookup; cursor pages report no total
+    assert conn.fetchval.await_count == 1
+    query, *params = conn.cursor.call_args.args
+    assert "(start_time, span_id) > ($2, $3)" in query
+    assert params[1:] == [datetime(2026, 1, 31, 12, 0, 0, tzinfo=UTC), SPAN_ID, 2]
+
+
+def test_list_trace_spans_not_found(client, mock_db_pool):
+    """Test listing spans for a trace that doesn't exist."""
+    pool, conn = mock_db_pool
+    conn.fetchval.return_value = None
+
+    response = client.get(f"/api/traces/{MISSING_ID}/spans")
+
+    assert response.status_code == 404
+
+
+def test_list_trace_spans_early_error_is_server_error(client, mock_db_pool):
+    """Test that failing to read the first rows is a 5xx, not a truncated 200."""
+    pool, conn = mock_db_pool
+    conn.fetchval.return_value = 5
+    conn.transaction = MagicMock(return_value=AsyncMock())
+    conn.cursor = MagicMock(side_effect=RuntimeError("cursor failed"))
+
+    with TestClient(client.app, raise_server_exceptions=False) as raw_client:
+        response = raw_client.get(f"/api/traces/{TRACE_ID}/spans")
+
+    assert response.status_code == 500
 
 
 def test_get_span_not_found(client, mock_db_pool):
@@ -259,7 +458,7 @@ def test_get_span_not_found(client, mock_db_pool):
     pool, conn = mock_db_pool
     conn.fetchrow.return_value = None
 
-    response = client.get("/api/spans/nonexistent")
+    response = client.get(f"/api/spans/{MISSING_ID}")
 
     assert response.status_code == 404
 
@@ -268,30 +467,9 @@ def test_get_span_success(client, mock_db_pool):
     """Test getting a span successfully."""
     pool, conn = mock_db_pool
 
-    mock_span = {
-        "span_id": "span-1",
-        "trace_id": "trace-1",
-        "parent_span_id": None,
-        "agent_id": "agent-1",
-        "agent_name": "TestAgent",
-        "agent_role": "coordinator",
-        "name": "agent_execution",
-        "kind": "agent",
-        "status": "ok",
-        "start_time": datetime(2026, 1, 31, 12, 0, 0, tzinfo=UTC),
-        "end_time": datetime(2026, 1, 31, 12, 0, 5, tzinfo=UTC),
-        "model": "gpt-4",
-        "input": {"query": "test"},
-        "output": {"result": "success"},
-        "error": None,
-        "attributes": {},
-        "input_tokens": 100,
-        "output_tokens": 50,
-        "cost_usd": 0.01,
-    }
-    conn.fetchrow.return_value = mock_span
+    conn.fetchrow.return_value = _SAMPLE_SPAN
 
-    response = client.get("/api/spans/span-1")
+    response = client.get(f"/api/spans/{SPAN_ID}")
 
     assert response.status_code == 200
     data = response.json()
@@ -299,6 +477,8 @@ def test_get_span_success(client, mock_db_pool):
     assert data["agent_name"] == "TestAgent"
     assert data["duration_ms"] == 5000.0  # 5 seconds
     assert data["input_tokens"] == 100
+    # Agent fields come joined onto the span row in the same lookup
+    assert conn.fetchrow.await_count == 1
 
 
 def test_classify_trace_not_found(client, mock_db_pool):
@@ -306,7 +486,7 @@ def test_classify_trace_not_found(client, mock_db_pool):
     pool, conn = mock_db_pool
     conn.fetchrow.return_value = None
 
-    response = client.post("/api/traces/nonexistent/classify")
+    response = client.post(f"/api/traces/{MISSING_ID}/classify")
 
     assert response.status_code == 404
 
@@ -314,7 +494,7 @@ def test_classify_trace_not_found(client, mock_db_pool):
 def test_api_pagination_limits(client, mock_db_pool):
     """Test that pagination parameters have correct limits."""
     pool, conn = mock_db_pool
-    conn.fetchval.return_value = 0
+    conn.fetchval.return_value = _plan(0)
     conn.fetch.return_value = []
 
     # Test max limit
@@ -328,3 +508,132 @@ def test_api_pagination_limits(client, mock_db_pool):
     # Test valid parameters
     response = client.get("/api/traces?limit=100&offset=0")
     assert response.status_code == 200
+
+
+def test_trace_list_params_limits():
+    """Test that TraceListParams enforces the pagination limits."""
+    # Test max limit
+    with pytest.raises(ValidationError):
+        api.TraceListParams.model_validate({"limit": 2000})
+
+    # Test negative offset
+    with pytest.raises(ValidationError):
+        api.TraceListParams.model_validate({"offset": -1})
+
+    # Test valid parameters
+    params = api.TraceListParams.model_validate({"limit": 100, "offset": 0})
+    assert (params.limit, params.offset) == (100, 0)
+
+
+def test_classify_trace_no_failures(client, mock_db_pool):
+    """Test classifying a trace whose spans have no detectable failures."""
+    pool, conn = mock_db_pool
+    conn.fetchrow.return_value = _SAMPLE_TRACE
+    conn.fetch.return_value = []
+
+    response = client.post(f"/api/traces/{TRACE_ID}/classify")
+
+    assert response.status_code == 200
+    assert response.json()["count"] == 0
+    # Trace, spans and agents are each read on their own pooled connection
+    assert pool.acquire.call_count >= 3
+
+
+def test_classify_trace_stores_annotations_in_one_copy(client, mock_db_pool):
+    """Test that detected failures are written with a single COPY."""
+    pool, conn = mock_db_pool
+    start = datetime(2026, 1, 31, 12, 0, 0, tzinfo=UTC)
+    conn.fetchrow.return_value = {"trace_id": TRACE_ID, "status": "failed"}
+    timed_out_span = {
+        "span_id": "span-1",
+        "agent_id": None,
+        "status": "timeout",
+        "start_time": start,
+        "end_time": start,
+    }
+    conn.fetch.side_effect = [[timed_out_span, {**timed_out_span, "span_id": "span-2"}], []]
+    conn.transaction = MagicMock(return_value=AsyncMock())
+
+    response = client.post(f"/api/traces/{TRACE_ID}/classify")
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["count"] == 2
+    conn.copy_records_to_table.assert_awaited_once()
+    records = conn.copy_records_to_table.call_args.kwargs["records"]
+    assert [str(record[0]) for record in records] == [
+        ann["annotation_id"] for ann in data["annotations"]
+    ]
+    assert [record[2] for record in records] == ["span-1", "span-2"]
+
+
+def test_classify_trace_writes_through_write_pool(client, mock_db_pool):
+    """Test that classification inserts use the write pool, not the read pool."""
+    pool, conn = mock_db_pool
+    write_pool = MagicMock()
+    write_conn = AsyncMock()
+    write_conn.transaction = MagicMock(return_value=AsyncMock())
+    write_pool.acquire.return_value.__aenter__ = AsyncMock(return_value=write_conn)
+    write_pool.acquire.return_value.__aexit__ = AsyncMock(return_value=None)
+    client.app.dependency_overrides[api.get_write_db] = lambda: write_pool
+
+    conn.fetchrow.return_value = {"trace_id": TRACE_ID, "status": "failed"}
+    conn.fetch.side_effect = [[{"span_id": SPAN_ID, "agent_id": None, "status": "timeout"}], []]
+
+    response = client.post(f"/api/traces/{TRACE_ID}/classify")
+
+    assert response.status_code == 200
+    write_conn.copy_records_to_table.assert_awaited_once()
+    conn.copy_records_to_table.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_pool_dependencies_read_set_db_pool(monkeypatch):
+    """Test that the pool dependencies serve the pools the server installs."""
+    # Restore the module globals afterwards so no other test sees these pools
+    monkeypatch.setattr(api, "_db_pool", None)
+    monkeypatch.setattr(api, "_db_write_pool", None)
+    read_pool = MagicMock()
+    write_pool = MagicMock()
+
+    api.set_db_pool(read_pool)
+    assert await api.get_db() is read_pool
+    assert await api.get_write_db(read_pool) is read_pool
+
+    api.set_db_pool(read_pool, write_pool=write_pool)
+    assert await api.get_write_db(read_pool) is write_pool
+
+
+@pytest.mark.asyncio
+async def test_init_read_connection_registers_jsonb_codec():
+    """Test that read connections decode JSONB with the binary codec."""
+    conn = AsyncMock()
+
+    await api.init_read_connection(conn)
+
+    conn.set_type_codec.assert_awaited_once()
+    kwargs = conn.set_type_codec.call_args.kwargs
+    assert conn.set_type_codec.call_args.args == ("jsonb",)
+    assert kwargs["format"] == "binary"
+    assert kwargs["decoder"](kwargs["encoder"]({"env": "prod"})) == {"env": "prod"}
+
+
+@pytest.mark.asyncio
+async def test_create_read_pool_passes_session_settings(monkeypatch):
+    """Test that read-pool GUCs are startup parameters, which survive RESET ALL."""
+    create_pool = AsyncMock()
+    monkeypatch.setattr(api.asyncpg, "create_pool", create_pool)
+
+    await api.create_read_pool("postgresql://localhost/agenttrace", max_size=10)
+
+    create_pool.assert_awaited_once()
+    kwargs = create_pool.call_args.kwargs
+    assert create_pool.call_args.args == ("postgresql://localhost/agenttrace",)
+    assert kwargs["server_settings"] == {
+        "jit": "on",
+        "jit_above_cost": "100000",
+        "work_mem": "64MB",
+        "default_transaction_read_only": "on",
+    }
+    assert kwargs["init"] is api.init_read_connection
+    assert kwargs["max_size"] == 10
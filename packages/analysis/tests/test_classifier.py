@@ -9,6 +9,16 @@ from agenttrace_analysis.mast import (
     RuleBasedClassifier,
 )
 
+FIXED_NOW = datetime(2026, 1, 1, tzinfo=UTC)
+
+
+def _group_by_mode(results: list[ClassificationResult]) -> dict[str, list[ClassificationResult]]:
+    """Group results by failure mode in one pass, keeping classify's order."""
+    results_by_mode: dict[str, list[ClassificationResult]] = {}
+    for result in results:
+        results_by_mode.setdefault(result.failure_mode, []).append(result)
+    return results_by_mode
+
 
 def test_failure_modes_exist():
     """Test that all expected failure modes are defined."""
@@ -75,7 +85,7 @@ def test_classifier_infinite_loop_detection():
     classifier = RuleBasedClassifier()
 
     # Create spans showing infinite loop pattern
-    base_time = datetime.now(UTC)
+    base_time = FIXED_NOW
     spans = [
         {
             "span_id": f"span-{i}",
@@ -99,11 +109,57 @@ def test_classifier_infinite_loop_detection():
     assert infinite_loop_results[0].agent_id == "agent-1"
 
 
+def test_classifier_infinite_loop_interleaved_agents():
+    """Test that loops are found per agent when spans from agents interleave."""
+    classifier = RuleBasedClassifier()
+
+    base_time = FIXED_NOW
+    inputs = [{"query": "start"}] + [{"query": "retry"}] * 5
+    spans = []
+    for i, input_data in enumerate(inputs):
+        for agent_id in ("agent-1", "agent-2"):
+            spans.append(
+                {
+                    "span_id": f"{agent_id}-span-{i}",
+                    "agent_id": agent_id,
+                    "start_time": base_time + timedelta(seconds=i),
+                    "input": input_data if agent_id == "agent-1" else {"step": i},
+                    "status": "ok",
+                }
+            )
+
+    results = classifier.classify({"trace_id": "trace-1"}, list(reversed(spans)), {})
+
+    loop_results = [r for r in results if r.failure_mode == "infinite_loop"]
+    assert [(r.agent_id, r.span_id) for r in loop_results] == [("agent-1", "agent-1-span-4")]
+
+
+def test_classifier_infinite_loop_big_int_inputs():
+    """Test that inputs orjson can't serialize still fingerprint and match."""
+    classifier = RuleBasedClassifier()
+
+    spans = [
+        {
+            "span_id": f"span-{i}",
+            "agent_id": "agent-1",
+            "input": {"n": 2**70},
+            "start_time": FIXED_NOW + timedelta(seconds=i),
+            "status": "ok",
+        }
+        for i in range(4)
+    ]
+
+    results = classifier.classify({"trace_id": "trace-1"}, spans, {})
+
+    loop_results = [r for r in results if r.failure_mode == "infinite_loop"]
+    assert [r.span_id for r in loop_results] == ["span-3"]
+
+
 def test_classifier_handoff_failure_detection():
     """Test detecting handoff failures."""
     classifier = RuleBasedClassifier()
 
-    base_time = datetime.now(UTC)
+    base_time = FIXED_NOW
     spans = [
         {
             "span_id": "span-1",
@@ -137,11 +193,52 @@ def test_classifier_handoff_failure_detection():
     assert handoff_results[0].agent_id == "agent-2"
 
 
+def test_classifier_handoff_failure_with_interleaved_spans():
+    """Test that the receiver's first span after the handoff is checked, not the adjacent span."""
+    classifier = RuleBasedClassifier()
+
+    base_time = FIXED_NOW
+    spans = [
+        {
+            "span_id": "span-1",
+            "agent_id": "agent-1",
+            "kind": "handoff",
+            "attributes": {"message.to_agent": "agent-2"},
+            "start_time": base_time,
+            "end_time": base_time + timedelta(seconds=1),
+            "status": "ok",
+        },
+        {
+            "span_id": "span-2",
+            "agent_id": "agent-3",
+            "start_time": base_time + timedelta(seconds=2),
+            "status": "ok",
+        },
+        {
+            "span_id": "span-3",
+            "agent_id": "agent-2",
+            "start_time": base_time + timedelta(seconds=3),
+            "status": "error",
+        },
+        {
+            "span_id": "span-4",
+            "agent_id": "agent-2",
+            "start_time": base_time + timedelta(seconds=4),
+            "status": "error",
+        },
+    ]
+
+    results = classifier.classify({"trace_id": "trace-1"}, spans, {})
+
+    handoff_results = [r for r in results if r.failure_mode == "handoff_failure"]
+    assert [(r.agent_id, r.span_id) for r in handoff_results] == [("agent-2", "span-3")]
+
+
 def test_classifier_resource_contention_detection():
     """Test detecting resource contention."""
     classifier = RuleBasedClassifier()
 
-    base_time = datetime.now(UTC)
+    base_time = FIXED_NOW
     spans = [
         {
             "span_id": "span-1",
@@ -176,6 +273,43 @@ def test_classifier_resource_contention_detection():
     assert len(contention_results) > 0
 
 
+def test_classifier_resource_contention_reports_each_pair_once():
+    """Test that repeated overlaps between two agents yield one result, and sequential calls none."""
+    classifier = RuleBasedClassifier()
+
+    base_time = FIXED_NOW
+    spans = [
+        {
+            "span_id": f"span-{i}",
+            "agent_id": f"agent-{i % 2 + 1}",
+            "kind": "tool_call",
+            "name": "tool.database_query",
+            "start_time": base_time + timedelta(seconds=i),
+            "end_time": base_time + timedelta(seconds=i + 3),
+            "status": "ok",
+        }
+        for i in range(50)
+    ]
+    spans += [
+        {
+            "span_id": f"search-{i}",
+            "agent_id": f"agent-{i % 2 + 1}",
+            "kind": "tool_call",
+            "name": "tool.search",
+            "start_time": base_time + timedelta(seconds=2 * i),
+            "end_time": base_time + timedelta(seconds=2 * i + 2),
+            "status": "ok",
+        }
+        for i in range(10)
+    ]
+
+    results = classifier.classify({"trace_id": "trace-1"}, spans, {})
+
+    contention_results = [r for r in results if r.failure_mode == "resource_contention"]
+    assert len(contention_results) == 2
+    assert all("tool.database_query" in r.reasoning for r in contention_results)
+
+
 def test_classifier_format_error_detection():
     """Test detecting message format errors."""
     classifier = RuleBasedClassifier()
@@ -186,7 +320,7 @@ def test_classifier_format_error_detection():
             "agent_id": "agent-1",
             "status": "error",
             "error_message": "JSON parse error: unexpected token",
-            "start_time": datetime.now(UTC),
+            "start_time": FIXED_NOW,
         }
     ]
 
@@ -201,11 +335,31 @@ def test_classifier_format_error_detection():
     assert "json" in format_results[0].reasoning.lower()
 
 
+def test_classifier_format_error_keywords_in_output():
+    """Test that keywords are found case-insensitively, including overlapping ones."""
+    classifier = RuleBasedClassifier()
+
+    spans = [
+        {
+            "span_id": "span-1",
+            "agent_id": "agent-1",
+            "status": "error",
+            "output": {"detail": "Could not Deserialize payload"},
+        }
+    ]
+
+    results = classifier.classify({"trace_id": "trace-1"}, spans, {})
+
+    format_results = [r for r in results if r.failure_mode == "message_format_error"]
+    assert len(format_results) == 1
+    assert "(keywords: serialize, deserialize)" in format_results[0].reasoning
+
+
 def test_classifier_timeout_detection():
     """Test detecting timeout failures."""
     classifier = RuleBasedClassifier()
 
-    base_time = datetime.now(UTC)
+    base_time = FIXED_NOW
     spans = [
         {
             "span_id": "span-1",
@@ -237,14 +391,14 @@ def test_classifier_no_failures():
             "agent_id": "agent-1",
             "status": "ok",
             "input": {"query": "test1"},
-            "start_time": datetime.now(UTC),
+            "start_time": FIXED_NOW,
         },
         {
             "span_id": "span-2",
             "agent_id": "agent-2",
             "status": "ok",
             "input": {"query": "test2"},
-            "start_time": datetime.now(UTC) + timedelta(seconds=1),
+            "start_time": FIXED_NOW + timedelta(seconds=1),
         },
     ]
 
@@ -264,7 +418,7 @@ def test_classifier_multiple_failures():
     """Test detecting multiple different failure types in one trace."""
     classifier = RuleBasedClassifier()
 
-    base_time = datetime.now(UTC)
+    base_time = FIXED_NOW
     spans = [
         # Timeout
         {
@@ -297,3 +451,8 @@ def test_classifier_multiple_failures():
     failure_modes = {r.failure_mode for r in results}
     assert "timeout" in failure_modes
     assert "message_format_error" in failure_modes
+
+    results_by_mode = _group_by_mode(results)
+    assert [r for rs in results_by_mode.values() for r in rs] == results
+    assert [r.span_id for r in results_by_mode["timeout"]] == ["span-1"]
+    assert [r.span_id for r in results_by_mode["message_format_error"]] == ["span-2"]
@@ -1,5 +1,10 @@
 """Tests for agent communication graph construction."""
 
+from decimal import Decimal
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
 from agenttrace_analysis.graph import AgentGraph, AgentNode, CommunicationEdge
 
 
@@ -77,8 +82,9 @@ def test_communication_edge_to_dict():
     assert result["from_agent"] == "agent-1"
     assert result["to_agent"] == "agent-2"
     assert result["metrics"]["message_count"] == 3
-    # Should deduplicate message types
-    assert len(result["metrics"]["message_types"]) == 2
+    # Should deduplicate message types, keeping first-seen order
+    assert edge.message_types == ["request", "response"]
+    assert result["metrics"]["message_types"] == ["request", "response"]
 
 
 def test_empty_graph():
@@ -168,6 +174,19 @@ def test_graph_find_bottlenecks():
     assert "agent-4" in bottlenecks
 
 
+def test_graph_degrees_updated_on_add():
+    """Test that adding an edge updates the agents' degrees."""
+    graph = AgentGraph()
+    graph.add_agent(AgentNode(agent_id="agent-1", name="Agent1"))
+    graph.add_agent(AgentNode(agent_id="agent-2", name="Agent2"))
+
+    assert graph.find_isolated_agents() == ["agent-1", "agent-2"]
+
+    graph.add_edge(CommunicationEdge(from_agent="agent-1", to_agent="agent-2", message_count=1))
+
+    assert graph.find_isolated_agents() == []
+
+
 def test_graph_has_cycles():
     """Test detecting cycles in graph."""
     graph = AgentGraph()
@@ -184,6 +203,40 @@ def test_graph_has_cycles():
     assert result["metrics"]["has_cycles"] is True
 
 
+def test_graph_has_cycles_acyclic_and_self_loop():
+    """Test that a chain is acyclic and a self-message counts as a cycle."""
+    graph = AgentGraph()
+
+    for agent_id in ("agent-1", "agent-2", "agent-3"):
+        graph.add_agent(AgentNode(agent_id=agent_id, name=agent_id))
+
+    graph.add_edge(CommunicationEdge(from_agent="agent-1", to_agent="agent-2", message_count=1))
+    graph.add_edge(CommunicationEdge(from_agent="agent-2", to_agent="agent-3", message_count=1))
+
+    assert graph.has_cycles() is False
+
+    graph.add_edge(CommunicationEdge(from_agent="agent-3", to_agent="agent-3", message_count=1))
+
+    assert graph.has_cycles() is True
+
+
+def test_graph_has_cycles_deep_chain():
+    """Test that cycle detection handles chains deeper than the recursion limit."""
+    graph = AgentGraph()
+    agent_ids = [f"agent-{i}" for i in range(5000)]
+
+    for agent_id in agent_ids:
+        graph.add_agent(AgentNode(agent_id=agent_id, name=agent_id))
+    for from_agent, to_agent in zip(agent_ids, agent_ids[1:], strict=False):
+        graph.add_edge(CommunicationEdge(from_agent=from_agent, to_agent=to_agent))
+
+    assert graph.has_cycles() is False
+
+    graph.add_edge(CommunicationEdge(from_agent=agent_ids[-1], to_agent=agent_ids[0]))
+
+    assert graph.has_cycles() is True
+
+
 def test_graph_get_node():
     """Test retrieving a node by ID."""
     graph = AgentGraph()
@@ -229,3 +282,70 @@ def test_graph_density():
 
     # Density = 2 / (3 * 2) = 0.333
     assert 0.3 < result["metrics"]["density"] < 0.4
+
+
+@pytest.mark.asyncio
+async def test_graph_from_trace_single_agent_query():
+    """Test that agent nodes and their metrics come from one aggregate query."""
+    conn = AsyncMock()
+    pool = MagicMock()
+    pool.acquire.return_value.__aenter__ = AsyncMock(return_value=conn)
+    pool.acquire.return_value.__aexit__ = AsyncMock(return_value=None)
+
+    conn.fetch.side_effect = [
+        [
+            {
+                "agent_id": f"agent-{i}",
+                "name": f"Agent{i}",
+                "role": None,
+                "model": None,
+                "span_count": 2,
+                "total_tokens": 100,
+                "total_cost_usd": 0.01,
+                "error_count": 0,
+                "avg_latency_ms": Decimal("12.5"),
+            }
+            for i in range(3)
+        ],
+        [],
+    ]
+
+    graph = await AgentGraph.from_trace("trace-1", pool)
+
+    assert len(graph.to_dict()["nodes"]) == 3
+    assert graph.get_node("agent-2").avg_latency_ms == 12.5
+    assert conn.fetch.await_count == 2
+    conn.fetchrow.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_graph_from_trace_builds_edges_from_aggregated_rows():
+    """Test that edges are built from per-pair rows reduced in SQL."""
+    conn = AsyncMock()
+    pool = MagicMock()
+    pool.acquire.return_value.__aenter__ = AsyncMock(return_value=conn)
+    pool.acquire.return_value.__aexit__ = AsyncMock(return_value=None)
+
+    conn.fetch.side_effect = [
+        [],
+        [
+            {
+                "from_agent": "agent-1",
+                "to_agent": "agent-2",
+                "message_count": 4,
+                "message_types": ["request", "response"],
+                "total_tokens": 120,
+                "avg_latency_ms": Decimal("250.0"),
+            }
+        ],
+    ]
+
+    graph = await AgentGraph.from_trace("trace-1", pool)
+
+    edge = graph.get_edge("agent-1", "agent-2")
+    assert edge is not None
+    assert edge.message_count == 4
+    assert sorted(edge.message_types) == ["request", "response"]
+    assert edge.total_tokens_transferred == 120
+    assert edge.avg_latency_ms == 250.0
+    assert "GROUP BY from_agent_id, to_agent_id" in conn.fetch.call_args.args[0]
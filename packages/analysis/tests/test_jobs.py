@@ -0,0 +1,243 @@
+"""Tests for background classification jobs."""
+
+import asyncio
+from datetime import UTC, datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from agenttrace_analysis.jobs import (
+    classify_failed_traces,
+    classify_trace,
+    periodic_classification_job,
+)
+
+
+@pytest.fixture
+def mock_db_pool():
+    """Create a mock database pool."""
+    pool = MagicMock()
+    conn = AsyncMock()
+    conn.transaction = MagicMock(return_value=AsyncMock())
+    pool.acquire.return_value.__aenter__ = AsyncMock(return_value=conn)
+    pool.acquire.return_value.__aexit__ = AsyncMock(return_value=None)
+    return pool, conn
+
+
+@pytest.mark.asyncio
+async def test_classify_failed_traces_loads_batch_in_bulk(mock_db_pool):
+    """Test that a batch of traces is loaded with a fixed number of queries."""
+    pool, conn = mock_db_pool
+    start = datetime(2026, 1, 31, 12, 0, 0, tzinfo=UTC)
+    trace_ids = ["trace-1", "trace-2", "trace-3"]
+
+    conn.fetch.side_effect = [
+        [{"trace_id": trace_id, "status": "failed"} for trace_id in trace_ids],
+        [{"trace_id": trace_id, "status": "failed"} for trace_id in trace_ids],
+        [
+            {
+                "trace_id": "trace-2",
+                "span_id": "span-1",
+                "agent_id": None,
+                "status": "timeout",
+                "start_time": start,
+                "end_time": start,
+            }
+        ],
+        [],
+    ]
+
+    classified = await classify_failed_traces(pool, batch_size=3)
+
+    assert classified == 3
+    assert conn.fetch.await_count == 4
+    conn.fetchrow.assert_not_called()
+    # Only trace-2 has a failure to store
+    conn.executemany.assert_awaited_once()
+    (record,) = conn.executemany.call_args.args[1]
+    assert record[1] == "trace-2"
+
+
+@pytest.mark.asyncio
+async def test_classify_trace_inserts_annotations_in_one_call(mock_db_pool):
+    """Test that a trace's annotations are written with a single executemany."""
+    pool, conn = mock_db_pool
+    start = datetime(2026, 1, 31, 12, 0, 0, tzinfo=UTC)
+    conn.fetchrow.return_value = {"trace_id": "trace-1", "status": "failed"}
+    conn.fetch.side_effect = [
+        [
+            {"span_id": f"span-{i}", "agent_id": None, "status": "timeout", "start_time": start}
+            for i in range(3)
+        ],
+        [],
+    ]
+
+    stored = await classify_trace("trace-1", pool)
+
+    assert len(stored) == 3
+    conn.executemany.assert_awaited_once()
+    records = conn.executemany.call_args.args[1]
+    assert [ann["annotation_id"] for ann in stored] == [record[0] for record in records]
+
+
+@pytest.mark.asyncio
+async def test_classify_failed_traces_isolates_write_failures(mock_db_pool):
+    """Test that one trace's failed write doesn't stop the others."""
+    pool, conn = mock_db_pool
+    start = datetime(2026, 1, 31, 12, 0, 0, tzinfo=UTC)
+    trace_ids = ["trace-1", "trace-2"]
+    conn.fetch.side_effect = [
+        [{"trace_id": trace_id, "status": "failed"} for trace_id in trace_ids],
+        [{"trace_id": trace_id, "status": "failed"} for trace_id in trace_ids],
+        [
+            {"trace_id": trace_id, "span_id": "span-1", "status": "timeout", "start_time": start}
+            for trace_id in trace_ids
+        ],
+        [],
+    ]
+    conn.executemany.side_effect = [RuntimeError("boom"), None]
+
+    classified = await classify_failed_traces(pool, batch_size=2, workers=2)
+
+    assert classified == 1
+    assert conn.executemany.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_periodic_job_resumes_after_high_water_mark(mock_db_pool):
+    """Test that each run selects only traces after the last one seen."""
+    pool, conn = mock_db_pool
+    start = datetime(2026, 1, 31, 12, 0, 0, tzinfo=UTC)
+
+    conn.fetch.side_effect = [
+        [],
+        [{"trace_id": "trace-1", "start_time": start}],
+        [{"trace_id": "trace-1", "status": "failed"}],
+        [],
+        [],
+        [],
+        [],
+    ]
+
+    with (
+        patch(
+            "agenttrace_analysis.jobs.asyncio.sleep",
+            AsyncMock(side_effect=[None, asyncio.CancelledError()]),
+        ),
+        pytest.raises(asyncio.CancelledError),
+    ):
+        await periodic_classification_job(pool, interval_seconds=1, batch_size=5)
+
+    _, first_run, *_, second_run = conn.fetch.call_args_list
+    assert first_run.args[1:3] == (5, datetime.min.replace(tzinfo=UTC))
+    assert second_run.args[1:] == (5, start, "trace-1")
+
+
+@pytest.mark.asyncio
+async def test_classify_trace_overwrite_replaces_in_transaction(mock_db_pool):
+    """Test that overwrite deletes and re-inserts inside one transaction."""
+    pool, conn = mock_db_pool
+    start = datetime(2026, 1, 31, 12, 0, 0, tzinfo=UTC)
+    conn.fetchrow.return_value = {"trace_id": "trace-1", "status": "failed"}
+    conn.fetch.side_effect = [
+        [{"span_id": "span-1", "agent_id": None, "status": "timeout", "start_time": start}],
+        [],
+    ]
+
+    await classify_trace("trace-1", pool, overwrite=True)
+
+    conn.transaction.assert_called_once()
+    conn.execute.assert_awaited_once()
+    assert "DELETE FROM failure_annotations" in conn.execute.call_args.args[0]
+    conn.executemany.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_periodic_job_returns_when_stop_event_set(mock_db_pool):
+    """Test that setting the stop event ends the job without waiting out the interval."""
+    pool, conn = mock_db_pool
+    conn.fetch.return_value = []
+    stop_event = asyncio.Event()
+
+    job = asyncio.create_task(
+        periodic_classification_job(pool, interval_seconds=3600, stop_event=stop_event)
+    )
+    await asyncio.sleep(0)
+    stop_event.set()
+
+    await asyncio.wait_for(job, timeout=1)
+    assert conn.fetch.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_periodic_job_rejects_non_positive_rescan_every(mock_db_pool):
+    """Test that a rescan_every below 1 is rejected up front."""
+    pool, conn = mock_db_pool
+
+    with pytest.raises(ValueError, match="rescan_every"):
+        await periodic_classification_job(pool, rescan_every=0)
+
+    conn.fetch.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_periodic_job_classifies_newest_failures_every_run(mock_db_pool):
+    """Test that fresh failures are classified even while the catch-up walk is behind."""
+    pool, conn = mock_db_pool
+    start = datetime(2026, 1, 31, 12, 0, 0, tzinfo=UTC)
+
+    conn.fetch.side_effect = [
+        [{"trace_id": "trace-new", "status": "failed"}],
+        [
+            {"trace_id": "trace-old", "start_time": start},
+            {"trace_id": "trace-new", "start_time": start + timedelta(hours=1)},
+        ],
+        [],
+        [],
+        [],
+    ]
+
+    with (
+        patch(
+            "agenttrace_analysis.jobs.asyncio.sleep",
+            AsyncMock(side_effect=asyncio.CancelledError()),
+        ),
+        pytest.raises(asyncio.CancelledError),
+    ):
+        await periodic_classification_job(pool, interval_seconds=1, batch_size=2)
+
+    newest_run, _, batch_traces, *_ = conn.fetch.call_args_list
+    assert newest_run.args[1:] == (2,)
+    assert batch_traces.args[1] == ["trace-new", "trace-old"]
+
+
+@pytest.mark.asyncio
+async def test_periodic_job_rescans_below_high_water_mark(mock_db_pool):
+    """Test that the mark is reset so traces that failed late are still found."""
+    pool, conn = mock_db_pool
+    start = datetime(2026, 1, 31, 12, 0, 0, tzinfo=UTC)
+
+    conn.fetch.side_effect = [
+        [],
+        [{"trace_id": "trace-2", "start_time": start}],
+        [{"trace_id": "trace-2", "status": "failed"}],
+        [],
+        [],
+        [],
+        [],
+        [],
+        [],
+    ]
+
+    with (
+        patch(
+            "agenttrace_analysis.jobs.asyncio.sleep",
+            AsyncMock(side_effect=[None, None, asyncio.CancelledError()]),
+        ),
+        pytest.raises(asyncio.CancelledError),
+    ):
+        await periodic_classification_job(pool, interval_seconds=1, batch_size=5, rescan_every=2)
+
+    *_, second_run, third_run = [c for c in conn.fetch.call_args_list if len(c.args) == 4]
+    assert second_run.args[2:] == (start, "trace-2")
+    assert third_run.args[2] == datetime.min.replace(tzinfo=UTC)
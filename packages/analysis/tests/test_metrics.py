@@ -1,6 +1,16 @@
 """Tests for metrics aggregation."""
 
-from agenttrace_analysis.metrics import TraceMetrics
+from datetime import UTC, datetime, timedelta
+from decimal import Decimal
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from agenttrace_analysis.metrics import (
+    TraceMetrics,
+    compute_trace_metrics,
+    compute_trace_metrics_batch,
+)
 
 
 def test_trace_metrics_creation():
@@ -85,3 +95,101 @@ def test_trace_metrics_empty_breakdowns():
     assert result["tokens_by_agent"] == {}
     assert result["latency_by_agent"] == {}
     assert result["cost_by_agent"] == {}
+
+
+@pytest.mark.asyncio
+async def test_compute_trace_metrics_single_query():
+    """Test that totals and per-agent rows come back from one grouping-sets query."""
+    conn = AsyncMock()
+    pool = MagicMock()
+    pool.acquire.return_value.__aenter__ = AsyncMock(return_value=conn)
+    pool.acquire.return_value.__aexit__ = AsyncMock(return_value=None)
+
+    start = datetime(2026, 1, 31, 12, 0, 0, tzinfo=UTC)
+    row = {
+        "agent_count": 0,
+        "span_count": 1,
+        "error_count": 0,
+        "trace_start": None,
+        "trace_end": None,
+    }
+    conn.fetch.return_value = [
+        {
+            **row,
+            "is_total": True,
+            "agent_id": None,
+            "agent_name": None,
+            "agent_count": 1,
+            "span_count": 3,
+            "total_tokens": 300,
+            "total_cost_usd": 0.03,
+            "error_count": 1,
+            "avg_latency_ms": Decimal("10"),
+            "trace_start": start,
+            "trace_end": start + timedelta(seconds=2),
+        },
+        {
+            **row,
+            "is_total": False,
+            "agent_id": "agent-1",
+            "agent_name": "Planner",
+            "total_tokens": 200,
+            "total_cost_usd": 0.02,
+            "avg_latency_ms": Decimal("12.5"),
+        },
+        {
+            **row,
+            "is_total": False,
+            "agent_id": None,
+            "agent_name": None,
+            "total_tokens": 100,
+            "total_cost_usd": 0.01,
+            "avg_latency_ms": Decimal("5"),
+        },
+    ]
+
+    metrics = await compute_trace_metrics("trace-1", pool)
+
+    conn.fetch.assert_awaited_once()
+    conn.fetchrow.assert_not_called()
+    assert metrics.span_count == 3
+    assert metrics.total_duration_ms == 2000.0
+    assert metrics.tokens_by_agent == {"Planner": 200}
+    assert metrics.latency_by_agent == {"Planner": 12.5}
+
+
+@pytest.mark.asyncio
+async def test_compute_trace_metrics_batch():
+    """Test that many traces are aggregated in one query and split per trace."""
+    conn = AsyncMock()
+    pool = MagicMock()
+    pool.acquire.return_value.__aenter__ = AsyncMock(return_value=conn)
+    pool.acquire.return_value.__aexit__ = AsyncMock(return_value=None)
+
+    row = {
+        "agent_id": None,
+        "agent_name": None,
+        "agent_count": 1,
+        "span_count": 2,
+        "total_tokens": 50,
+        "total_cost_usd": 0.01,
+        "error_count": 0,
+        "avg_latency_ms": Decimal("4"),
+        "trace_start": None,
+        "trace_end": None,
+    }
+    conn.fetch.return_value = [
+        {**row, "trace_id": "trace-1", "is_total": True},
+        {**row, "trace_id": "trace-1", "is_total": False, "agent_id": "a1", "agent_name": "Coder"},
+        {**row, "trace_id": "trace-2", "is_total": True, "span_count": 7},
+    ]
+
+    results = await compute_trace_metrics_batch(["trace-1", "trace-2", "trace-3"], pool)
+
+    conn.fetch.assert_awaited_once()
+    assert conn.fetch.call_args.args[1] == ["trace-1", "trace-2", "trace-3"]
+    assert results["trace-1"].span_count == 2
+    assert results["trace-1"].tokens_by_agent == {"Coder": 50}
+    assert results["trace-2"].span_count == 7
+    assert results["trace-2"].tokens_by_agent == {}
+    assert results["trace-3"].span_count == 0
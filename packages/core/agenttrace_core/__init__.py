@@ -1,9 +1,30 @@
 """AgentTrace Core - Shared data models and utilities."""
 
+from __future__ import annotations
+
+import importlib
+from typing import TYPE_CHECKING, Any
+
 __version__ = "0.1.0"
 
-from .exceptions import AgentTraceError, CheckpointError, TraceNotFoundError
-from .models import Agent, AgentInfo, MessageInfo, NormalizedSpan, Span, Trace
+if TYPE_CHECKING:
+    from .exceptions import AgentTraceError, CheckpointError, TraceNotFoundError
+    from .models import Agent, AgentInfo, MessageInfo, NormalizedSpan, Span, Trace
+
+# Public names and the submodule defining each. They are imported on first
+# access (PEP 562), so importing agenttrace_core.config or .exceptions does
+# not also build the pydantic models.
+_LAZY_EXPORTS = {
+    "Trace": ".models",
+    "Span": ".models",
+    "Agent": ".models",
+    "AgentInfo": ".models",
+    "MessageInfo": ".models",
+    "NormalizedSpan": ".models",
+    "AgentTraceError": ".exceptions",
+    "TraceNotFoundError": ".exceptions",
+    "CheckpointError": ".exceptions",
+}
 
 __all__ = [
     "Trace",
@@ -16,3 +37,18 @@ __all__ = [
     "TraceNotFoundError",
     "CheckpointError",
 ]
+
+
+def __getattr__(name: str) -> Any:
+    """Import a public name from its submodule on first access."""
+    module_name = _LAZY_EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    """List the lazy exports alongside the module's own attributes."""
+    return sorted({*globals(), *__all__})
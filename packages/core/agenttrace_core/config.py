@@ -1,5 +1,7 @@
 """Configuration management for AgentTrace."""
 
+from functools import lru_cache
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -26,8 +28,17 @@ class Settings(BaseSettings):
         env_file=".env",
         env_file_encoding="utf-8",
         case_sensitive=False,
+        # get_settings() hands one cached instance to every caller
+        frozen=True,
     )
 
 
-# Global settings instance
-settings = Settings()
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """
+    Get the process-wide settings, reading the environment on first use.
+
+    Call get_settings.cache_clear() to re-read it, e.g. after changing
+    environment variables in tests.
+    """
+    return Settings()
@@ -1,11 +1,12 @@
 """Core data models for AgentTrace."""
 
+from dataclasses import dataclass, field
 from datetime import datetime
 from decimal import Decimal
-from typing import Any
+from typing import Any, Literal
 from uuid import UUID, uuid4
 
-from pydantic import BaseModel, ConfigDict, Field
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter
 
 
 class Trace(BaseModel):
@@ -119,27 +120,35 @@ class Span(BaseModel):
     )
 
 
-class AgentInfo(BaseModel):
+# The normalizer output types below are built once per ingested span from
+# values the normalizers have already extracted and typed, so they are plain
+# slotted dataclasses rather than models that re-validate every field.
+
+
+@dataclass(slots=True, kw_only=True)
+class AgentInfo:
     """Agent metadata extracted during normalization."""
 
     name: str
     role: str | None = None
     model: str | None = None
     framework: str | None = None
-    config: dict[str, Any] = Field(default_factory=dict)
+    config: dict[str, Any] = field(default_factory=dict)
 
 
-class MessageInfo(BaseModel):
+@dataclass(slots=True, kw_only=True)
+class MessageInfo:
     """Inter-agent message data."""
 
     from_agent: str | None = None
     to_agent: str | None = None
     message_type: str = "request"  # request, response, broadcast, handoff
-    content: dict[str, Any] = Field(default_factory=dict)
+    content: dict[str, Any] = field(default_factory=dict)
     timestamp: datetime | None = None
 
 
-class NormalizedSpan(BaseModel):
+@dataclass(slots=True, kw_only=True)
+class NormalizedSpan:
     """Normalized span output from framework-specific normalizers."""
 
     span_id: str
@@ -155,13 +164,13 @@ class NormalizedSpan(BaseModel):
     agent: AgentInfo | None = None
 
     # Inter-agent messages extracted from this span
-    messages: list[MessageInfo] = Field(default_factory=list)
+    messages: list[MessageInfo] = field(default_factory=list)
 
     # LLM-specific fields
     model: str | None = None
     input_tokens: int | None = None
     output_tokens: int | None = None
-    cost_usd: Decimal | None = None
+    cost_usd: float | None = None  # spans.cost_usd is DOUBLE PRECISION
 
     # Content
     input: dict[str, Any] | None = None
@@ -169,4 +178,18 @@ class NormalizedSpan(BaseModel):
     error: dict[str, Any] | None = None
 
     # OpenTelemetry semantic attributes
-    attributes: dict[str, Any] = Field(default_factory=dict)
+    attributes: dict[str, Any] = field(default_factory=dict)
+
+    def model_dump(self, mode: Literal["json", "python"] = "python") -> dict[str, Any]:
+        """Serialize the span, nested agent and messages to a dict.
+
+        Args:
+            mode: "python" keeps native types, "json" converts them to
+                JSON-compatible values (as with BaseModel.model_dump)
+        """
+        dumped: dict[str, Any] = _SPAN_ADAPTER.dump_python(self, mode=mode)
+        return dumped
+
+
+# Built once and reused; only needed when a span is serialized
+_SPAN_ADAPTER = TypeAdapter(NormalizedSpan)
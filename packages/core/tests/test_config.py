@@ -0,0 +1,43 @@
+"""Tests for settings loading."""
+
+import pytest
+from pydantic import ValidationError
+
+from agenttrace_core.config import Settings, get_settings
+
+
+@pytest.fixture(autouse=True)
+def fresh_settings():
+    """Make each test read settings from its own environment."""
+    get_settings.cache_clear()
+    yield
+    get_settings.cache_clear()
+
+
+def test_get_settings_is_cached():
+    """Test that settings are built once and shared."""
+    settings = get_settings()
+
+    assert isinstance(settings, Settings)
+    assert get_settings() is settings
+
+
+def test_settings_are_frozen():
+    """Test that the shared settings instance cannot be modified."""
+    settings = get_settings()
+
+    with pytest.raises(ValidationError):
+        settings.log_level = "DEBUG"
+
+
+def test_get_settings_reads_environment(monkeypatch):
+    """Test that prefixed environment variables override defaults."""
+    monkeypatch.setenv("AGENTTRACE_OTLP_HTTP_PORT", "9318")
+
+    assert get_settings().otlp_http_port == 9318
+
+    monkeypatch.delenv("AGENTTRACE_OTLP_HTTP_PORT")
+    assert get_settings().otlp_http_port == 9318  # cached until cleared
+
+    get_settings.cache_clear()
+    assert get_settings().otlp_http_port == 4318
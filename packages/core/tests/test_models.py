@@ -4,7 +4,7 @@ from datetime import datetime
 from decimal import Decimal
 from uuid import UUID, uuid4
 
-from agenttrace_core.models import Agent, Span, Trace
+from agenttrace_core.models import Agent, AgentInfo, MessageInfo, NormalizedSpan, Span, Trace
 
 
 def test_trace_creation():
@@ -113,3 +113,44 @@ def test_agent_with_config():
     assert agent.config["temperature"] == 0.7
     assert agent.config["max_tokens"] == 2000
     assert "python_repl" in agent.config["tools"]
+
+
+def test_normalized_span_model_dump():
+    """Test that NormalizedSpan serializes with its nested agent and messages."""
+    start = datetime(2026, 1, 29, 10, 0, 0)
+    span = NormalizedSpan(
+        span_id="0102030405060708",
+        trace_id="11121314151617181920212223242526",
+        name="llm_call",
+        kind="llm_call",
+        start_time=start,
+        agent=AgentInfo(name="Planner", framework="langgraph"),
+        messages=[MessageInfo(from_agent="Planner", to_agent="Coder", message_type="handoff")],
+        cost_usd=0.0045,
+    )
+
+    span_dict = span.model_dump()
+    assert span_dict["start_time"] == start
+    assert span_dict["agent"] == {
+        "name": "Planner",
+        "role": None,
+        "model": None,
+        "framework": "langgraph",
+        "config": {},
+    }
+    assert span_dict["messages"][0]["to_agent"] == "Coder"
+    assert span_dict["attributes"] == {}
+
+    json_dict = span.model_dump(mode="json")
+    assert json_dict["start_time"] == "2026-01-29T10:00:00"
+    assert json_dict["cost_usd"] == 0.0045
+
+
+def test_package_exports_models_lazily():
+    """Test that package-level names resolve to the submodule classes."""
+    import agenttrace_core
+
+    assert agenttrace_core.Trace is Trace
+    assert agenttrace_core.Span is Span
+    assert agenttrace_core.Agent is Agent
+    assert set(agenttrace_core.__all__) <= set(dir(agenttrace_core))
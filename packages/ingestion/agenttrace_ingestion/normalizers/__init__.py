@@ -1,20 +1,28 @@
 """Framework-specific normalizers for OTLP spans."""
 
+from functools import lru_cache
+
 from .autogen import AutoGenNormalizer
 from .base import BaseNormalizer
 from .crewai import CrewAINormalizer
 from .generic import GenericNormalizer
 from .langgraph import LangGraphNormalizer
 
-# Registry of normalizers by framework name
-_NORMALIZERS: dict[str, BaseNormalizer] = {
-    "langgraph": LangGraphNormalizer(),
-    "autogen": AutoGenNormalizer(),
-    "crewai": CrewAINormalizer(),
-    "generic": GenericNormalizer(),
+# Normalizer classes by framework name; each is instantiated on first use
+_NORMALIZER_CLASSES: dict[str, type[BaseNormalizer]] = {
+    "langgraph": LangGraphNormalizer,
+    "autogen": AutoGenNormalizer,
+    "crewai": CrewAINormalizer,
+    "generic": GenericNormalizer,
 }
 
+# Shared normalizer instances by framework name (normalizers are stateless)
+_INSTANCES: dict[str, BaseNormalizer] = {}
+
 
+# The framework string comes from client resource attributes, so the cache is
+# bounded; spellings that differ only in case share one instance
+@lru_cache(maxsize=16)
 def get_normalizer(framework: str) -> BaseNormalizer:
     """
     Get the appropriate normalizer for a framework.
@@ -26,7 +34,13 @@ def get_normalizer(framework: str) -> BaseNormalizer:
         BaseNormalizer instance for the framework, or GenericNormalizer if unknown
     """
     framework_lower = framework.lower() if framework else "generic"
-    return _NORMALIZERS.get(framework_lower, _NORMALIZERS["generic"])
+    if framework_lower not in _NORMALIZER_CLASSES:
+        framework_lower = "generic"
+
+    normalizer = _INSTANCES.get(framework_lower)
+    if normalizer is None:
+        normalizer = _INSTANCES.setdefault(framework_lower, _NORMALIZER_CLASSES[framework_lower]())
+    return normalizer
 
 
 __all__ = [
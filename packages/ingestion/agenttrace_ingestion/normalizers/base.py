@@ -1,10 +1,20 @@
 """Base normalizer class for framework-specific normalization."""
 
-from datetime import UTC
+from datetime import UTC, datetime
 from typing import Any
 
 from agenttrace_core.models import NormalizedSpan
 
+_NS_PER_SECOND = 1_000_000_000
+
+# OTLP marks a root span with an all-zero parent span id
+_ZERO_SPAN_ID = bytes(8)
+
+# Attribute keys for the same value, in order of preference
+MODEL_KEYS = ("llm.model", "gen_ai.request.model")
+INPUT_TOKEN_KEYS = ("llm.token_count.prompt", "gen_ai.usage.input_tokens")
+OUTPUT_TOKEN_KEYS = ("llm.token_count.completion", "gen_ai.usage.output_tokens")
+
 
 class BaseNormalizer:
     """
@@ -60,7 +70,7 @@ class BaseNormalizer:
         return result
 
     def _extract_any_value(self, value: Any) -> Any:
-        """Extract value from AnyValue protobuf."""
+        """Extract value from AnyValue protobuf, recursing into arrays and kvlists."""
         if value.HasField("string_value"):
             return value.string_value
         elif value.HasField("bool_value"):
@@ -69,8 +79,38 @@ class BaseNormalizer:
             return value.int_value
         elif value.HasField("double_value"):
             return value.double_value
+        elif value.HasField("array_value"):
+            return [self._extract_any_value(v) for v in value.array_value.values]
+        elif value.HasField("kvlist_value"):
+            return self._extract_attributes(value.kvlist_value.values)
         return None
 
+    def _span_ids(self, span: Any) -> tuple[str, str, str | None]:
+        """Return the hex span, trace and parent span ids of an OTLP span.
+
+        OTLP ids are protobuf bytes fields, so they are hex-encoded directly.
+        The parent id is None for root spans (empty or all-zero).
+        """
+        parent_span_id = None
+        if span.parent_span_id and span.parent_span_id != _ZERO_SPAN_ID:
+            parent_span_id = span.parent_span_id.hex()
+        return span.span_id.hex(), span.trace_id.hex(), parent_span_id
+
+    @staticmethod
+    def _token_count(value: Any) -> int | None:
+        """Coerce a token-count attribute to int, or None if it isn't numeric.
+
+        Clients may send counts as string or double attributes, and the spans
+        token columns are INTEGER, so an uncoerced value would fail the whole
+        writer batch.
+        """
+        if value is None:
+            return None
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            return None
+
     def _map_status(self, status: Any) -> str:
         """Map OTLP status to AgentTrace status."""
         if not status:
@@ -81,8 +121,6 @@ class BaseNormalizer:
             return "error"
         return "ok"
 
-    def _ns_to_datetime(self, ns: int):
+    def _ns_to_datetime(self, ns: int) -> datetime:
         """Convert nanoseconds timestamp to datetime."""
-        from datetime import datetime
-
-        return datetime.fromtimestamp(ns / 1_000_000_000, tz=UTC)
+        return datetime.fromtimestamp(ns / _NS_PER_SECOND, tz=UTC)
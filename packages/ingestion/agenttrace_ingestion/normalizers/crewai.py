@@ -4,7 +4,7 @@ from typing import Any
 
 from agenttrace_core.models import AgentInfo, NormalizedSpan
 
-from .base import BaseNormalizer
+from .base import MODEL_KEYS, BaseNormalizer
 
 
 class CrewAINormalizer(BaseNormalizer):
@@ -24,15 +24,9 @@ class CrewAINormalizer(BaseNormalizer):
         attrs = self._extract_attributes(span.attributes)
 
         # Extract basic span information
-        span_id = span.span_id.hex() if hasattr(span.span_id, "hex") else str(span.span_id)
-        trace_id = span.trace_id.hex() if hasattr(span.trace_id, "hex") else str(span.trace_id)
-        parent_span_id = None
-        if span.parent_span_id and span.parent_span_id != b"\x00" * 8:
-            parent_span_id = (
-                span.parent_span_id.hex()
-                if hasattr(span.parent_span_id, "hex")
-                else str(span.parent_span_id)
-            )
+        span_id, trace_id, parent_span_id = self._span_ids(span)
+
+        model = attrs.get(MODEL_KEYS[0]) or attrs.get(MODEL_KEYS[1])
 
         # Extract agent information
         agent_info = None
@@ -41,7 +35,7 @@ class CrewAINormalizer(BaseNormalizer):
             agent_info = AgentInfo(
                 name=agent_name,
                 role=attrs.get("crewai.agent.role") or attrs.get("agent.role"),
-                model=attrs.get("llm.model") or attrs.get("gen_ai.request.model"),
+                model=model,
                 framework=self.FRAMEWORK,
                 config={
                     "crew": attrs.get("crewai.crew.name"),
@@ -50,12 +44,13 @@ class CrewAINormalizer(BaseNormalizer):
             )
 
         # Determine span kind
+        name_lower = span.name.lower()
         kind = "agent_message"
-        if "task" in span.name.lower():
+        if "task" in name_lower:
             kind = "agent_message"
-        elif "llm" in span.name.lower() or attrs.get("gen_ai.operation.name"):
+        elif "llm" in name_lower or attrs.get("gen_ai.operation.name"):
             kind = "llm_call"
-        elif "tool" in span.name.lower():
+        elif "tool" in name_lower:
             kind = "tool_call"
 
         return NormalizedSpan(
@@ -70,8 +65,8 @@ class CrewAINormalizer(BaseNormalizer):
             ),
             status=self._map_status(span.status),
             agent=agent_info,
-            model=attrs.get("llm.model") or attrs.get("gen_ai.request.model"),
-            input_tokens=attrs.get("gen_ai.usage.input_tokens"),
-            output_tokens=attrs.get("gen_ai.usage.output_tokens"),
+            model=model,
+            input_tokens=self._token_count(attrs.get("gen_ai.usage.input_tokens")),
+            output_tokens=self._token_count(attrs.get("gen_ai.usage.output_tokens")),
             attributes=attrs,
         )
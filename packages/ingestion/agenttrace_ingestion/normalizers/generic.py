@@ -4,7 +4,7 @@ from typing import Any
 
 from agenttrace_core.models import AgentInfo, NormalizedSpan
 
-from .base import BaseNormalizer
+from .base import INPUT_TOKEN_KEYS, MODEL_KEYS, OUTPUT_TOKEN_KEYS, BaseNormalizer
 
 
 class GenericNormalizer(BaseNormalizer):
@@ -21,15 +21,9 @@ class GenericNormalizer(BaseNormalizer):
         attrs = self._extract_attributes(span.attributes)
 
         # Extract basic span information
-        span_id = span.span_id.hex() if hasattr(span.span_id, "hex") else str(span.span_id)
-        trace_id = span.trace_id.hex() if hasattr(span.trace_id, "hex") else str(span.trace_id)
-        parent_span_id = None
-        if span.parent_span_id and span.parent_span_id != b"\x00" * 8:
-            parent_span_id = (
-                span.parent_span_id.hex()
-                if hasattr(span.parent_span_id, "hex")
-                else str(span.parent_span_id)
-            )
+        span_id, trace_id, parent_span_id = self._span_ids(span)
+
+        model = attrs.get(MODEL_KEYS[0]) or attrs.get(MODEL_KEYS[1])
 
         # Try to extract agent information from common attributes
         agent_info = None
@@ -41,7 +35,7 @@ class GenericNormalizer(BaseNormalizer):
             agent_info = AgentInfo(
                 name=agent_name,
                 role=attrs.get("agent.role"),
-                model=attrs.get("llm.model") or attrs.get("gen_ai.request.model"),
+                model=model,
                 framework=resource_attrs.get("agent.framework", self.FRAMEWORK),
             )
 
@@ -60,11 +54,13 @@ class GenericNormalizer(BaseNormalizer):
             ),
             status=self._map_status(span.status),
             agent=agent_info,
-            model=attrs.get("llm.model") or attrs.get("gen_ai.request.model"),
-            input_tokens=attrs.get("llm.token_count.prompt")
-            or attrs.get("gen_ai.usage.input_tokens"),
-            output_tokens=attrs.get("llm.token_count.completion")
-            or attrs.get("gen_ai.usage.output_tokens"),
+            model=model,
+            input_tokens=self._token_count(
+                attrs.get(INPUT_TOKEN_KEYS[0]) or attrs.get(INPUT_TOKEN_KEYS[1])
+            ),
+            output_tokens=self._token_count(
+                attrs.get(OUTPUT_TOKEN_KEYS[0]) or attrs.get(OUTPUT_TOKEN_KEYS[1])
+            ),
             attributes=attrs,
         )
 
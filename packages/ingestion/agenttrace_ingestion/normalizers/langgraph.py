@@ -1,11 +1,18 @@
 """LangGraph-specific normalizer."""
 
 import json
+import re
 from typing import Any
 
+import orjson
+
 from agenttrace_core.models import AgentInfo, MessageInfo, NormalizedSpan
 
-from .base import BaseNormalizer
+from .base import INPUT_TOKEN_KEYS, MODEL_KEYS, OUTPUT_TOKEN_KEYS, BaseNormalizer
+
+# orjson parses integers wider than 64 bits into floats, losing precision, so
+# text with a digit run that long is parsed by the exact stdlib decoder instead
+_WIDE_INT_RE = re.compile(r"\d{19}")
 
 
 class LangGraphNormalizer(BaseNormalizer):
@@ -26,15 +33,9 @@ class LangGraphNormalizer(BaseNormalizer):
         attrs = self._extract_attributes(span.attributes)
 
         # Extract basic span information
-        span_id = span.span_id.hex() if hasattr(span.span_id, "hex") else str(span.span_id)
-        trace_id = span.trace_id.hex() if hasattr(span.trace_id, "hex") else str(span.trace_id)
-        parent_span_id = None
-        if span.parent_span_id and span.parent_span_id != b"\x00" * 8:
-            parent_span_id = (
-                span.parent_span_id.hex()
-                if hasattr(span.parent_span_id, "hex")
-                else str(span.parent_span_id)
-            )
+        span_id, trace_id, parent_span_id = self._span_ids(span)
+
+        model = attrs.get(MODEL_KEYS[0]) or attrs.get(MODEL_KEYS[1])
 
         # Extract agent information
         agent_info = None
@@ -42,7 +43,7 @@ class LangGraphNormalizer(BaseNormalizer):
             agent_info = AgentInfo(
                 name=attrs["langgraph.node"],
                 role=attrs.get("langgraph.node_type", "unknown"),
-                model=attrs.get("llm.model") or attrs.get("gen_ai.request.model"),
+                model=model,
                 framework=self.FRAMEWORK,
                 config={
                     "step": attrs.get("langgraph.step"),
@@ -68,10 +69,11 @@ class LangGraphNormalizer(BaseNormalizer):
         kind = self._determine_kind(span, attrs)
 
         # Extract LLM-specific fields
-        model = attrs.get("llm.model") or attrs.get("gen_ai.request.model")
-        input_tokens = attrs.get("llm.token_count.prompt") or attrs.get("gen_ai.usage.input_tokens")
-        output_tokens = attrs.get("llm.token_count.completion") or attrs.get(
-            "gen_ai.usage.output_tokens"
+        input_tokens = self._token_count(
+            attrs.get(INPUT_TOKEN_KEYS[0]) or attrs.get(INPUT_TOKEN_KEYS[1])
+        )
+        output_tokens = self._token_count(
+            attrs.get(OUTPUT_TOKEN_KEYS[0]) or attrs.get(OUTPUT_TOKEN_KEYS[1])
         )
 
         # Calculate cost if we have token information and model
@@ -140,9 +142,10 @@ class LangGraphNormalizer(BaseNormalizer):
         if isinstance(value, dict):
             return value
         if isinstance(value, str):
+            loads = json.loads if _WIDE_INT_RE.search(value) else orjson.loads
             try:
-                return json.loads(value)
-            except (json.JSONDecodeError, TypeError):
+                return loads(value)
+            except ValueError:
                 return {"raw": value}
         return {}
 
@@ -3,10 +3,11 @@
 import logging
 from contextlib import asynccontextmanager
 
+import asyncpg
 from fastapi import FastAPI, Request, status
 from fastapi.responses import JSONResponse
 
-from agenttrace_core.config import Settings
+from agenttrace_core.config import get_settings
 
 from .normalizers import get_normalizer
 from .otlp import determine_framework, extract_resource_attributes, parse_otlp_request
@@ -14,7 +15,7 @@ from .writers import DatabaseWriter
 
 # Import analysis API
 try:
-    from agenttrace_analysis import api_router, set_db_pool
+    from agenttrace_analysis import api_router, create_read_pool, set_db_pool
 
     ANALYSIS_AVAILABLE = True
 except ImportError:
@@ -29,28 +30,42 @@ logger = logging.getLogger(__name__)
 # Global writer instance
 writer: DatabaseWriter | None = None
 
+# Read-only pool for the analysis API
+read_pool: asyncpg.Pool | None = None
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Manage application lifecycle."""
-    global writer
+    global writer, read_pool
 
     # Startup
-    settings = Settings()
+    settings = get_settings()
     logger.info(f"Starting AgentTrace Service on {settings.otlp_http_port}")
 
     writer = DatabaseWriter(settings.database_url, batch_size=100)
     await writer.connect()
     logger.info("Database connection pool created")
 
-    # Set database pool for analysis API
+    # Analysis API reads go through their own read-only, session-tuned pool;
+    # classification writes reuse the ingestion writer's pool
     if ANALYSIS_AVAILABLE and writer._pool:
-        set_db_pool(writer._pool)
+        read_pool = await create_read_pool(
+            settings.database_url,
+            min_size=2,
+            max_size=10,
+            command_timeout=60,
+            statement_cache_size=1024,
+            max_cached_statement_lifetime=0,
+        )
+        set_db_pool(read_pool, write_pool=writer._pool)
         logger.info("Analysis API initialized")
 
     yield
 
     # Shutdown
+    if read_pool:
+        await read_pool.close()
     if writer:
         await writer.flush()
         await writer.close()
@@ -1,7 +1,6 @@
 """Database writer for ingested traces."""
 
 import asyncio
-from decimal import Decimal
 from uuid import UUID, uuid4
 
 import asyncpg
@@ -36,8 +35,15 @@ class DatabaseWriter:
 
     async def connect(self):
         """Create connection pool."""
+        # The same few statements repeat for the life of a connection, so keep
+        # every prepared statement cached rather than re-planning on expiry
         self._pool = await asyncpg.create_pool(
-            self.database_url, min_size=5, max_size=20, command_timeout=60
+            self.database_url,
+            min_size=5,
+            max_size=20,
+            command_timeout=60,
+            statement_cache_size=1024,
+            max_cached_statement_lifetime=0,
         )
 
     async def close(self):
@@ -173,8 +179,8 @@ class DatabaseWriter:
                     span.agent.name,
                 )
 
-            # Convert cost_usd to Decimal if it's a float
-            cost_usd = Decimal(str(span.cost_usd)) if span.cost_usd is not None else None
+            # cost_usd columns are DOUBLE PRECISION
+            cost_usd = float(span.cost_usd) if span.cost_usd is not None else None
 
             await conn.execute(
                 """
@@ -70,11 +70,22 @@ class TestLangGraphNormalizer:
         result = normalizer.normalize(mock_span, {})
 
         assert result.span_id == "0102030405060708"
+        assert result.trace_id == "1112131415161718191a1b1c1d1e1f20"
+        assert result.parent_span_id is None
         assert result.name == "test_span"
         assert result.agent is not None
         assert result.agent.name == "Planner"
         assert result.agent.framework == "langgraph"
 
+    def test_normalize_child_span(self, mock_span):
+        """Test that a non-zero parent span id is hex-encoded."""
+        mock_span.parent_span_id = b"\x0a\x0b\x0c\x0d\x0e\x0f\x10\x11"
+
+        normalizer = LangGraphNormalizer()
+        result = normalizer.normalize(mock_span, {})
+
+        assert result.parent_span_id == "0a0b0c0d0e0f1011"
+
     def test_normalize_llm_call(self, mock_span):
         """Test LLM call span normalization."""
         mock_span.name = "llm_call"
@@ -94,6 +105,32 @@ class TestLangGraphNormalizer:
         assert result.output_tokens == 50
         assert result.cost_usd is not None  # Cost should be estimated
 
+    def test_normalize_json_content(self, mock_span):
+        """Test JSON input/output attributes are parsed, with a raw fallback."""
+        mock_span.attributes = [
+            create_attribute("langgraph.node", "Coder"),
+            create_attribute("langgraph.input", '{"task": "write tests", "files": [1, 2]}'),
+            create_attribute("langgraph.output", "not json"),
+        ]
+
+        normalizer = LangGraphNormalizer()
+        result = normalizer.normalize(mock_span, {})
+
+        assert result.input == {"input": {"task": "write tests", "files": [1, 2]}}
+        assert result.output == {"output": {"raw": "not json"}}
+
+    def test_normalize_json_wide_ints(self, mock_span):
+        """Test integers wider than 64 bits are parsed exactly, not as floats."""
+        mock_span.attributes = [
+            create_attribute("langgraph.node", "Coder"),
+            create_attribute("langgraph.input", '{"id": 123456789012345678901234, "n": 1}'),
+        ]
+
+        normalizer = LangGraphNormalizer()
+        result = normalizer.normalize(mock_span, {})
+
+        assert result.input == {"input": {"id": 123456789012345678901234, "n": 1}}
+
     def test_normalize_handoff(self, mock_span):
         """Test handoff/edge span normalization."""
         mock_span.name = "langgraph.edge"
@@ -220,6 +257,71 @@ class TestGenericNormalizer:
 
         assert result.kind == "tool_call"
 
+    def test_normalize_prefers_llm_attribute_keys(self, mock_span):
+        """Test llm.* keys win over gen_ai.* keys, which fill in when unset."""
+        mock_span.attributes = [
+            create_attribute("agent.name", "GenericAgent"),
+            create_attribute("llm.model", "gpt-4"),
+            create_attribute("gen_ai.request.model", "gpt-3.5-turbo"),
+            create_attribute("llm.token_count.prompt", 120),
+            create_attribute("gen_ai.usage.output_tokens", 30),
+        ]
+
+        normalizer = GenericNormalizer()
+        result = normalizer.normalize(mock_span, {})
+
+        assert result.model == "gpt-4"
+        assert result.agent.model == "gpt-4"
+        assert result.input_tokens == 120
+        assert result.output_tokens == 30
+
+    def test_normalize_coerces_token_counts(self, mock_span):
+        """Test token counts sent as strings are stored as ints, junk as None."""
+        mock_span.attributes = [
+            create_attribute("gen_ai.usage.input_tokens", "42"),
+            create_attribute("gen_ai.usage.output_tokens", "many"),
+        ]
+
+        normalizer = GenericNormalizer()
+        result = normalizer.normalize(mock_span, {})
+
+        assert result.input_tokens == 42
+        assert result.output_tokens is None
+
+    def test_infer_kind_keyword_precedence(self, mock_span):
+        """Test LLM keywords win over tool keywords anywhere in the name."""
+        mock_span.name = "Tool_Chat_Wrapper"
+
+        normalizer = GenericNormalizer()
+        result = normalizer.normalize(mock_span, {})
+
+        assert result.kind == "llm_call"
+
+    def test_extract_nested_attributes(self):
+        """Test array and kvlist values are extracted recursively."""
+        array_attr = Mock()
+        array_attr.key = "tags"
+        array_attr.value.HasField = lambda x: x == "array_value"
+        nested_attr = Mock()
+        nested_attr.HasField = lambda x: x == "kvlist_value"
+        nested_attr.kvlist_value.values = [create_attribute("k", True)]
+        array_attr.value.array_value.values = [
+            create_attribute("", "a").value,
+            create_attribute("", 2).value,
+            nested_attr,
+        ]
+        kvlist_attr = Mock()
+        kvlist_attr.key = "config"
+        kvlist_attr.value.HasField = lambda x: x == "kvlist_value"
+        kvlist_attr.value.kvlist_value.values = [create_attribute("temperature", 0.5)]
+        unset_attr = Mock()
+        unset_attr.key = "empty"
+        unset_attr.value.HasField = lambda x: False
+
+        result = GenericNormalizer()._extract_attributes([array_attr, kvlist_attr, unset_attr])
+
+        assert result == {"tags": ["a", 2, {"k": True}], "config": {"temperature": 0.5}}
+
 
 class TestNormalizerFactory:
     """Tests for get_normalizer factory."""
@@ -248,3 +350,8 @@ class TestNormalizerFactory:
         """Test case-insensitive framework matching."""
         normalizer = get_normalizer("LangGraph")
         assert isinstance(normalizer, LangGraphNormalizer)
+
+    def test_get_normalizer_reuses_instances(self):
+        """Test that case variants of a framework share one normalizer."""
+        assert get_normalizer("CrewAI") is get_normalizer("crewai")
+        assert get_normalizer("unknown_framework") is get_normalizer("")
@@ -347,7 +347,7 @@ class ReplayExecutor:
             error=row["error"],
             duration_ms=row["duration_ms"],
             tokens_used=row["tokens_used"],
-            cost_usd=float(row["cost_usd"]) if row["cost_usd"] else None,
+            cost_usd=row["cost_usd"],
         )
 
     async def list_replays_for_trace(self, trace_id: str) -> list[dict[str, Any]]:
@@ -383,7 +383,7 @@ class ReplayExecutor:
                 "error": row["error"],
                 "duration_ms": row["duration_ms"],
                 "tokens_used": row["tokens_used"],
-                "cost_usd": float(row["cost_usd"]) if row["cost_usd"] else None,
+                "cost_usd": row["cost_usd"],
                 "created_at": row["created_at"].isoformat(),
             }
             for row in rows